@@ -7,11 +7,17 @@ import urllib3
 import altair as alt
 import requests
 import io
-import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import re
+import os
 from collections import Counter
+from results_charts import count_likert_answers, count_numeric_scale_answers, age_category_stats, WORDCLOUD_OPTIONS
+from render_worker import RenderService
+from data_cache import (
+    SingleFlight, StaleWhileRevalidateCache, ConditionalCsvFetcher, DerivedCache, normalize_pseudo,
+    build_participant_index, WordFrequencyStore
+)
 # Vérifier que wordcloud est disponible, sinon l'installer
 try:
     from wordcloud import WordCloud
@@ -24,6 +30,8 @@ except ImportError:
 # region Config
 # This line bypasses SSL verification.
 ssl._create_default_https_context = ssl._create_unverified_context
+# Same for requests (ConditionalCsvFetcher(verify=False)), without a warning on every download
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Configuration de la page (DOIT être la première commande st)
 st.set_page_config(
@@ -39,9 +47,27 @@ SHEET_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRCbQDPet7-hUdVO0-C
 #endregion
 
 # region Charger les données et afficher les noms des colonnes
-@st.cache_data(ttl=60)
-def load_data():
-    df = pd.read_csv(SHEET_URL)
+# Stale-while-revalidate : plus jeunes que SOFT, les données sont servies telles quelles ; entre SOFT et HARD
+# elles sont servies pendant qu'un rafraîchissement tourne en arrière-plan ; au-delà de HARD on attend.
+SOFT_TTL_SECONDS = 60
+HARD_TTL_SECONDS = 600
+
+
+@st.cache_resource
+def get_data_cache():
+    """Cache stale-while-revalidate partagé par toutes les sessions du processus."""
+    return StaleWhileRevalidateCache(SingleFlight())
+
+
+@st.cache_resource
+def get_csv_fetcher():
+    """Téléchargements conditionnels des liens CSV publiés, partagés par toutes les sessions."""
+    # Sans vérification du certificat, comme pd.read_csv avec le contournement SSL ci-dessus
+    return ConditionalCsvFetcher(verify=False)
+
+
+def parse_data(source):
+    df = pd.read_csv(source)
     # Convertir la colonne Timestamp en datetime
     df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%m/%d/%Y %H:%M:%S')
 
@@ -54,6 +80,17 @@ def load_data():
     return df_filtered
 
 
+def fetch_data(csv_fetcher):
+    # Si la feuille n'a pas changé, on garde les données déjà lues (ni téléchargement ni parsing)
+    return csv_fetcher.fetch(SHEET_URL, parse_data)
+
+
+def load_data():
+    # Récupéré ici, dans le thread du script : fetch_data peut tourner dans un rafraîchissement en arrière-plan
+    csv_fetcher = get_csv_fetcher()
+    return get_data_cache().get(SHEET_URL, lambda: fetch_data(csv_fetcher), SOFT_TTL_SECONDS, HARD_TTL_SECONDS)
+
+
 # Charger les données
 df = load_data()
 # endregion
@@ -71,396 +108,106 @@ st.dataframe(df.head())
 
 # region Utils Functions
 
-# Simplifier les labels pour l'affichage
-def simplify_category(category):
+# Groupes des comparaisons adolescents / adultes (nuages de mots, donuts)
+def simplify_group(category):
     if pd.isna(category):
         return "Non spécifié"
     elif "ado" in category.lower():
-        return "Adolescents (11-17 ans)"
+        return "Adolescents"
     elif "adulte" in category.lower():
         return "Adultes"
     else:
         return category
 
-# endregion
 
-# region Graph Functions
-# Fonction pour créer un graphique Likert
-def create_likert_chart(data, question_col, title, participant_answer=None):
-    """
-    Crée un graphique Likert horizontal
-    """
-    # Compter les réponses
-    counts = data[question_col].value_counts()
-
-    # Calculer les pourcentages
-    percentages = (counts / len(data)) * 100
-
-    # Créer le graphique
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    # Définir les couleurs pour l'échelle Likert (du négatif au positif)
-    colors = ['#d32f2f', '#f57c00', '#fbc02d', '#388e3c']  # Rouge, Orange, Jaune, Vert
-
-    # Créer les barres horizontales
-    bars = ax.barh(range(len(counts)), percentages.values,
-                   color=colors[:len(counts)], alpha=0.7, edgecolor='black', linewidth=1)
-
-    # Mettre en évidence la réponse du participant si elle existe
-    if participant_answer is not None and participant_answer in counts.index:
-        participant_idx = list(counts.index).index(participant_answer)
-        bars[participant_idx].set_edgecolor('red')
-        bars[participant_idx].set_linewidth(3)
-        bars[participant_idx].set_alpha(1.0)
-
-    # Personnaliser le graphique
-    ax.set_yticks(range(len(counts)))
-    ax.set_yticklabels(counts.index, fontsize=11)
-    ax.set_xlabel('Pourcentage des réponses (%)', fontsize=12, fontweight='bold')
-    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-
-    # Ajouter les valeurs sur les barres
-    for i, (bar, count, pct) in enumerate(zip(bars, counts.values, percentages.values)):
-        ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
-                f'{count} ({pct:.1f}%)',
-                ha='left', va='center', fontweight='bold', fontsize=10)
-
-    # Améliorer l'apparence
-    ax.set_xlim(0, max(percentages.values) * 1.2)
-    ax.grid(axis='x', alpha=0.3, linestyle='--')
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-
-    plt.tight_layout()
-    return fig
-
-# Fonction pour créer un graphique d'échelle numérique
-def create_numeric_scale_chart(data, question_col, title, participant_answer=None):
-    """
-    Crée un graphique en barres pour une échelle numérique (1-10)
-    """
-    # Compter les réponses
-    counts = data[question_col].value_counts().sort_index()
-
-    # S'assurer que toutes les valeurs de 1 à 10 sont présentes
-    all_values = pd.Series(0, index=range(1, 11))
-    for value, count in counts.items():
-        if 1 <= value <= 10:
-            all_values[value] = count
-
-    # Calculer les pourcentages
-    percentages = (all_values / len(data)) * 100
-
-    fig, ax = plt.subplots(figsize=(14, 8))
-
-    # Définir un gradient de couleurs du vert (peu préoccupé) au rouge (très préoccupé)
-    colors = plt.cm.RdYlGn_r(np.linspace(0.2, 0.8, 10))
-
-    # Créer les barres
-    bars = ax.bar(range(1, 11), percentages.values, color=colors, alpha=0.7,
-                  edgecolor='black', linewidth=1)
-
-    # Mettre en évidence la réponse du participant
-    if participant_answer is not None and 1 <= participant_answer <= 10:
-        bars[int(participant_answer) - 1].set_edgecolor('red')
-        bars[int(participant_answer) - 1].set_linewidth(4)
-        bars[int(participant_answer) - 1].set_alpha(1.0)
-
-    # Personnaliser le graphique
-    ax.set_xlabel('Niveau de préoccupation (1 = Pas du tout, 10 = Extrêmement)',
-                  fontsize=12, fontweight='bold')
-    ax.set_ylabel('Pourcentage des réponses (%)', fontsize=12, fontweight='bold')
-    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-    ax.set_xticks(range(1, 11))
-
-    # Ajouter les valeurs sur les barres
-    for i, (bar, count, pct) in enumerate(zip(bars, all_values.values, percentages.values)):
-        if count > 0:  # N'afficher que si il y a des réponses
-            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
-                    f'{count}\n({pct:.1f}%)',
-                    ha='center', va='bottom', fontweight='bold', fontsize=9)
-
-    # Améliorer l'apparence
-    ax.set_ylim(0, max(percentages.values) * 1.2 if max(percentages.values) > 0 else 10)
-    ax.grid(axis='y', alpha=0.3, linestyle='--')
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-
-    plt.tight_layout()
-    return fig
-
-# Fonction pour créer un graphique de comparaison par catégorie d'âge
-def create_age_category_comparison_chart(data, question_col, category_col, title):
-    """
-    Crée un graphique comparant les réponses entre adolescents et adultes
-    """
-    # Filtrer les données valides (réponses de 1 à 10)
-    valid_data = data[
-        (data[question_col].between(1, 10)) &
-        (data[category_col].notna())
-        ].copy()
-
-    if len(valid_data) == 0:
-        return None
-
-    valid_data['Groupe_Simple'] = valid_data[category_col].apply(simplify_category)
-
-    # Calculer les moyennes par groupe
-    avg_by_group = valid_data.groupby('Groupe_Simple')[question_col].agg(['mean', 'count', 'std']).round(2)
-
-    #fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-    fig, ax1 = plt.subplots(1, 1, figsize=(16, 10))
-
-    # Graphique 1: Moyennes par groupe avec barres d'erreur
-    colors = ['#ff7f50', '#4682b4']  # Orange pour ados, Bleu pour adultes
-    bars1 = ax1.bar(avg_by_group.index, avg_by_group['mean'],
-                    color=colors[:len(avg_by_group)], alpha=0.7,
-                    edgecolor='black', linewidth=1,
-                    yerr=avg_by_group['std'], capsize=5)
-
-    ax1.set_ylabel('Niveau moyen de préoccupation', fontsize=11, fontweight='bold')
-    ax1.set_title('Niveau moyen de préoccupation par groupe', fontsize=12, fontweight='bold')
-    ax1.set_ylim(0, 10)
-    ax1.grid(axis='y', alpha=0.3, linestyle='--')
-
-    # Rotation des labels si nécessaire
-    ax1.tick_params(axis='x', rotation=45)
-
-    # Ajouter les valeurs sur les barres
-    for i, (bar, (idx, row)) in enumerate(zip(bars1, avg_by_group.iterrows())):
-        ax1.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.2,
-                 f'{row["mean"]:.1f}\n(n={int(row["count"])})',
-                 ha='center', va='bottom', fontweight='bold', fontsize=10)
-
-    # Graphique 2: Distribution détaillée
-    # groups = valid_data['Groupe_Simple'].unique()
-    # if len(groups) >= 2:
-    #     data_by_group = [valid_data[valid_data['Groupe_Simple'] == group][question_col]
-    #                      for group in sorted(groups)]
-    #
-    #     bins = np.arange(0.5, 11.5, 1)
-    #     ax2.hist(data_by_group, bins=bins, alpha=0.7,
-    #              label=sorted(groups), color=colors[:len(groups)],
-    #              edgecolor='black')
-    #     ax2.set_xlabel('Niveau de préoccupation', fontsize=11, fontweight='bold')
-    #     ax2.set_ylabel('Nombre de réponses', fontsize=11, fontweight='bold')
-    #     ax2.set_title('Distribution des réponses par groupe', fontsize=12, fontweight='bold')
-    #     ax2.set_xticks(range(1, 11))
-    #     ax2.legend()
-    #     ax2.grid(axis='y', alpha=0.3, linestyle='--')
-
-    plt.tight_layout()
-    return fig
-
-# Fonction pour créer comparaison de wordcloud graphique
-def create_wordcloud_comparison(data, text_col, category_col):
-    """
-    Crée des word clouds comparatifs pour adolescents et adultes
-    """
-
-    # Préparer les données
-    valid_data = data[(data[text_col].notna()) & (data[category_col].notna())].copy()
-    valid_data['Groupe_Simple'] = valid_data[category_col].apply(simplify_category)
+@st.cache_resource
+def get_participant_index(code_col):
+    """Index code secret -> ligne, partagé par toutes les sessions et recalculé par version des données."""
+    return DerivedCache(lambda data: build_participant_index(data, code_col))
 
-    # Séparer les réponses par groupe
-    adolescents_text = valid_data[valid_data['Groupe_Simple'] == 'Adolescents'][text_col]
-    adultes_text = valid_data[valid_data['Groupe_Simple'] == 'Adultes'][text_col]
 
-    if len(adolescents_text) == 0 and len(adultes_text) == 0:
-        return None, None
+def find_participant(data, code_col, code):
+    """Retrouve la ligne du participant (ou None) par une recherche dans l'index."""
+    position = get_participant_index(code_col).get(data).get(normalize_pseudo(code))
+    return None if position is None else data.iloc[position]
 
-    # Nettoyer et combiner le texte pour chaque groupe
-    def clean_and_combine_text(text_series):
-        if len(text_series) == 0:
-            return ""
-
-        # Combiner tous les textes
-        combined_text = ' '.join(text_series.astype(str))
+# endregion
 
-        # Nettoyer le texte (optionnel - vous pouvez ajuster selon vos besoins)
-        combined_text = re.sub(r'[^\w\s]', ' ', combined_text)  # Supprimer la ponctuation
-        combined_text = re.sub(r'\s+', ' ', combined_text)  # Normaliser les espaces
+# region Graph Functions
+# Les graphiques sont construits dans des processus de rendu (render_worker.py), qui ne reçoivent que les
+# données agrégées : ni le thread du script ni les autres sessions n'attendent matplotlib. 0 : rendu sur place.
+RENDER_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+RENDER_QUEUE_SIZE = 8  # rendus autorisés à attendre un processus ; au-delà, on attend une place
+RENDER_TIMEOUT_SECONDS = 30  # pour la place et le rendu ensemble
 
-        return combined_text.lower()
 
-    adolescents_combined = clean_and_combine_text(adolescents_text)
-    adultes_combined = clean_and_combine_text(adultes_text)
+@st.cache_resource
+def get_render_service():
+    """Processus de rendu partagés par toutes les sessions, démarrés avec le serveur."""
+    service = RenderService(RENDER_WORKERS, RENDER_QUEUE_SIZE, RENDER_TIMEOUT_SECONDS)
+    service.start()
+    return service
 
-    # Créer les word clouds
-    wordcloud_kwargs = {
-        'width': 800,
-        'height': 400,
-        'background_color': 'white',
-        'max_words': 100,
-        'relative_scaling': 0.5,
-        'min_font_size': 10
-    }
 
-    wc_adolescents = None
-    wc_adultes = None
+def show_chart(chart, *args):
+    """
+    Affiche le graphique `chart` (nom dans results_charts.CHARTS) construit par un processus de rendu.
+    Renvoie le PNG, None si le graphique n'a rien à afficher, False si le rendu a pris trop de temps.
+    """
+    try:
+        png = get_render_service().render(chart, *args)
+    except TimeoutError:
+        st.warning("⏳ Le graphique met trop de temps à s'afficher, réessaie dans un instant.")
+        return False
+    if png is not None:
+        st.image(png, use_container_width=True)
+    return png
 
-    if adolescents_combined.strip():
-        wc_adolescents = WordCloud(**wordcloud_kwargs, colormap='Oranges').generate(adolescents_combined)
 
-    if adultes_combined.strip():
-        wc_adultes = WordCloud(**wordcloud_kwargs, colormap='Blues').generate(adultes_combined)
+@st.cache_resource
+def get_word_frequencies(text_col, category_col):
+    """Fréquences des mots d'une colonne de texte libre par catégorie, partagées par toutes les sessions et complétées au fil des réponses."""
+    return WordFrequencyStore(text_col, category_col)
 
-    return wc_adolescents, wc_adultes
 
-def plot_wordclouds(wc_adolescents, wc_adultes, adolescents_count, adultes_count):
+def explode_answers(data, question_col, category_col):
     """
-    Affiche les word clouds côte à côte
+    Découpe une fois pour toutes les réponses multiples (séparées par des virgules) en format long
     """
-    # Déterminer le nombre de subplots nécessaires
-    valid_clouds = sum([wc_adolescents is not None, wc_adultes is not None])
-
-    if valid_clouds == 0:
-        st.warning("Aucun word cloud ne peut être généré - données textuelles insuffisantes")
-        return None
+    valid_data = data[(data[question_col].notna()) & (data[category_col].notna())]
 
-    if valid_clouds == 1:
-        fig, ax = plt.subplots(1, 1, figsize=(12, 6))
-        axes = [ax]
-    else:
-        fig, axes = plt.subplots(1, 2, figsize=(16, 8))
+    groups = valid_data[category_col].apply(simplify_group)
 
-    current_ax = 0
+    answers = valid_data[question_col].astype(str).str.split(',').explode().str.strip()
+    return pd.DataFrame({'group': groups.reindex(answers.index).values, 'answer': answers.values})
 
-    # Word cloud des adolescents
-    if wc_adolescents is not None:
-        axes[current_ax].imshow(wc_adolescents, interpolation='bilinear')
-        axes[current_ax].set_title(f'🧑‍🎓 Adolescents (n={adolescents_count})',
-                                   fontsize=14, fontweight='bold', color='#ff7f50')
-        axes[current_ax].axis('off')
-        current_ax += 1
 
-    # Word cloud des adultes
-    if wc_adultes is not None:
-        ax_index = current_ax if valid_clouds == 2 else 0
-        axes[ax_index].imshow(wc_adultes, interpolation='bilinear')
-        axes[ax_index].set_title(f'👨‍👩‍👧‍👦 Adultes (n={adultes_count})',
-                                 fontsize=14, fontweight='bold', color='#4682b4')
-        axes[ax_index].axis('off')
+@st.cache_resource
+def get_answer_index(question_col, category_col):
+    """Réponses multiples en format long, partagées par toutes les sessions et recalculées par version des données."""
+    return DerivedCache(lambda df: explode_answers(df, question_col, category_col))
 
-    plt.tight_layout()
-    return fig
 
 def create_donut_comparison(data, question_col, category_col):
     """
     Crée des graphiques en donut comparatifs pour adolescents et adultes
     """
 
-    # Préparer les données
-    valid_data = data[(data[question_col].notna()) & (data[category_col].notna())].copy()
-    valid_data['Groupe_Simple'] = valid_data[category_col].apply(simplify_category)
+    # Cette colonne peut contenir plusieurs réponses séparées par des virgules :
+    # elles sont découpées une seule fois par version des données, puis comptées de façon vectorisée
+    long_form = get_answer_index(question_col, category_col).get(data)
+    sizes = long_form.groupby(['group', 'answer'], sort=False).size()
 
-    # Séparer les données par groupe
-    adolescents_data = valid_data[valid_data['Groupe_Simple'] == 'Adolescents'][question_col]
-    adultes_data = valid_data[valid_data['Groupe_Simple'] == 'Adultes'][question_col]
-
-    # Cette colonne peut contenir plusieurs réponses séparées par des virgules
-    # On va les séparer et compter chaque élément
-    def process_multiple_answers(data_series):
-        if len(data_series) == 0:
+    def group_counts(group):
+        if group not in sizes.index.get_level_values('group'):
             return {}
+        return Counter({answer: int(count) for answer, count in sizes.loc[group].items()})
 
-        all_answers = []
-        for response in data_series:
-            if pd.notna(response):
-                # Séparer les réponses multiples (supposant qu'elles sont séparées par des virgules)
-                answers = [answer.strip() for answer in str(response).split(',')]
-                all_answers.extend(answers)
-        # Compter les occurrences
-        return Counter(all_answers)
-
-    adolescents_counts = process_multiple_answers(adolescents_data)
-    adultes_counts = process_multiple_answers(adultes_data)
+    adolescents_counts = group_counts('Adolescents')
+    adultes_counts = group_counts('Adultes')
 
     return adolescents_counts, adultes_counts
 
-def plot_donut_charts(adolescents_counts, adultes_counts):
-    """
-    Affiche les graphiques en donut côte à côte
-    """
-    # Vérifier s'il y a des données
-    if not adolescents_counts and not adultes_counts:
-        st.warning("Aucune donnée disponible pour créer les graphiques")
-        return None
-
-    # Déterminer le nombre de graphiques à afficher
-    charts_to_show = []
-    if adolescents_counts:
-        charts_to_show.append(('Adolescents', adolescents_counts, '#ff7f50'))
-    if adultes_counts:
-        charts_to_show.append(('Adultes', adultes_counts, '#4682b4'))
-
-    if len(charts_to_show) == 0:
-        return None
-
-    # Créer la figure
-    if len(charts_to_show) == 1:
-        fig, ax = plt.subplots(1, 1, figsize=(10, 8))
-        axes = [ax]
-    else:
-        fig, axes = plt.subplots(1, 2, figsize=(16, 8))
-
-    for i, (group_name, counts, base_color) in enumerate(charts_to_show):
-        ax = axes[i] if len(charts_to_show) > 1 else axes[0]
-
-        # Préparer les données pour le graphique
-        labels = list(counts.keys())
-        sizes = list(counts.values())
-        total_responses = sum(sizes)
-
-        # Tronquer les labels trop longs pour l'affichage
-        display_labels = []
-        for label in labels:
-            if len(label) > 30:
-                display_labels.append(label[:27] + "...")
-            else:
-                display_labels.append(label)
-
-        # Créer une palette de couleurs basée sur la couleur de base
-        if base_color == '#ff7f50':  # Orange pour adolescents
-            colors = plt.cm.Oranges(np.linspace(0.4, 0.8, len(sizes)))
-        else:  # Bleu pour adultes
-            colors = plt.cm.Blues(np.linspace(0.4, 0.8, len(sizes)))
-
-        # Créer le donut chart
-        wedges, texts, autotexts = ax.pie(
-            sizes,
-            labels=display_labels,
-            colors=colors,
-            autopct=lambda pct: f'{pct:.1f}%\n({int(pct / 100 * total_responses)})',
-            startangle=90,
-            pctdistance=0.85,
-            wedgeprops=dict(width=0.5, edgecolor='white', linewidth=2)
-        )
-
-        # Personnaliser le texte
-        for autotext in autotexts:
-            autotext.set_color('black')
-            autotext.set_fontweight('bold')
-            autotext.set_fontsize(9)
-
-        for text in texts:
-            text.set_fontsize(10)
-            text.set_fontweight('bold')
-
-        # Ajouter le titre avec emoji approprié
-        emoji = "🧑‍🎓" if group_name == "Adolescents" else "👨‍👩‍👧‍👦"
-        ax.set_title(f'{emoji} {group_name}\n({total_responses} réponses)',
-                     fontsize=14, fontweight='bold', pad=20)
-
-        # Ajouter le texte au centre du donut
-        ax.text(0, 0, f'{total_responses}\nréponses',
-                horizontalalignment='center', verticalalignment='center',
-                fontsize=12, fontweight='bold',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
-
-    plt.tight_layout()
-    return fig
-
 #endregion
 
 # region Section pour le code secret
@@ -472,9 +219,9 @@ participant_data = None
 valid_code = False
 
 if secret_code:
-    if secret_code in df["Choisis ton code secret"].values:
+    participant_data = find_participant(df, "Choisis ton code secret", secret_code)
+    if participant_data is not None:
         st.success("Code secret valide! Tu peux voir tes résultats.")
-        participant_data = df[df["Choisis ton code secret"] == secret_code].iloc[0]
         valid_code = True
     else:
         st.error("Code secret invalide. Vérifie ton code et réessaie.")
@@ -502,15 +249,13 @@ if screen_habit_column in df.columns:
         st.info(f"🎯 **Ta réponse :** {participant_screen_habit}")
 
     # Créer et afficher le graphique Likert
-    fig = create_likert_chart(
-        df,
-        screen_habit_column,
+    show_chart(
+        'likert',
+        *count_likert_answers(df, screen_habit_column),
         "Habitudes d'écrans avant le sommeil - Échelle de Likert",
         participant_screen_habit
     )
 
-    st.pyplot(fig)
-
     # Ajouter une légende si un participant est mis en évidence
     if valid_code and participant_data is not None:
         st.caption("🔴 **Barre avec bordure rouge** : Votre réponse")
@@ -561,12 +306,12 @@ if ai_concern_column in df.columns:
                 st.write(f"**Interprétation :** {interpretation}")
 
         # Créer le graphique principal
-        fig1 = create_numeric_scale_chart(
-            df, ai_concern_column,
+        show_chart(
+            'numeric_scale',
+            *count_numeric_scale_answers(df, ai_concern_column),
             "Distribution des niveaux de préoccupation concernant l'IA",
             participant_ai_concern
         )
-        st.pyplot(fig1)
 
         # Ajouter la légende si un participant est mis en évidence
         if valid_code and participant_data is not None and pd.notna(participant_ai_concern):
@@ -576,10 +321,9 @@ if ai_concern_column in df.columns:
         if age_category_column in df.columns:
             st.subheader("📈 Comparaison Adolescents vs Adultes")
 
-            fig2 = create_age_category_comparison_chart(df, ai_concern_column, age_category_column,
-                                                        "Comparaison des préoccupations IA : Ados vs Adultes")
+            fig2 = show_chart('age_comparison', age_category_stats(df, ai_concern_column, age_category_column),
+                              "Comparaison des préoccupations IA : Ados vs Adultes")
             if fig2 is not None:
-                st.pyplot(fig2)
 
                 # Analyse comparative détaillée
                 valid_comparison_data = df[
@@ -660,19 +404,8 @@ if wordcloud_available and ai_features_column in df.columns and age_category_col
 
     if len(valid_responses) > 0:
         # Compter les réponses par groupe
-        def simplify_category(category):
-            if pd.isna(category):
-                return "Non spécifié"
-            elif "ado" in category.lower():
-                return "Adolescents"
-            elif "adulte" in category.lower():
-                return "Adultes"
-            else:
-                return category
-
-
         valid_responses_copy = valid_responses.copy()
-        valid_responses_copy['Groupe_Simple'] = valid_responses_copy[age_category_column].apply(simplify_category)
+        valid_responses_copy['Groupe_Simple'] = valid_responses_copy[age_category_column].apply(simplify_group)
 
         group_counts = valid_responses_copy['Groupe_Simple'].value_counts()
         adolescents_count = group_counts.get('Adolescents', 0)
@@ -689,14 +422,18 @@ if wordcloud_available and ai_features_column in df.columns and age_category_col
         with col3:
             st.metric("📝 Total", len(valid_responses))
 
-        # Créer les word clouds
-        wc_adolescents, wc_adultes = create_wordcloud_comparison(df, ai_features_column, age_category_column)
-
-        # Afficher les word clouds
-        fig = plot_wordclouds(wc_adolescents, wc_adultes, adolescents_count, adultes_count)
+        # Fréquences des mots par groupe, tenues à jour au fil des nouvelles réponses
+        word_store = get_word_frequencies(ai_features_column, age_category_column)
+        word_store.sync(df)
+        adolescents_frequencies = word_store.frequencies('ado', WORDCLOUD_OPTIONS['max_words'])
+        adultes_frequencies = word_store.frequencies('adulte', WORDCLOUD_OPTIONS['max_words'])
+
+        # Créer et afficher les word clouds (générés par un processus de rendu)
+        fig = show_chart('wordclouds', dict(adolescents_frequencies), dict(adultes_frequencies),
+                         int(adolescents_count), int(adultes_count))
+        if fig is None:
+            st.warning("Aucun word cloud ne peut être généré - données textuelles insuffisantes")
         if fig is not None:
-            st.pyplot(fig)
-
             # Ajouter des explications
             st.write("**💡 Comment lire ces nuages de mots :**")
             st.write("- Plus un mot est **grand**, plus il apparaît fréquemment dans les réponses")
@@ -712,45 +449,19 @@ if wordcloud_available and ai_features_column in df.columns and age_category_col
         # Optionnel: Afficher les réponses les plus fréquentes
         st.subheader("🔤 Mots les plus fréquents")
 
-        # Analyser les mots les plus fréquents pour chaque groupe
-        def get_top_words(text_series, top_n=10):
-            if len(text_series) == 0:
-                return []
-
-            # Combiner tout le texte
-            all_text = ' '.join(text_series.astype(str).str.lower())
-
-            # Extraire les mots (supprimer la ponctuation)
-            words = re.findall(r'\b\w+\b', all_text)
-
-            # Filtrer les mots trop courts ou communs
-            stop_words = {'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'de', 'du', 'dans', 'avec', 'pour', 'sur',
-                          'par', 'que', 'qui', 'ce', 'cette', 'ces', 'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils',
-                          'elles', 'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'à', 'au', 'aux'}
-            filtered_words = [word for word in words if len(word) > 2 and word not in stop_words]
-
-            # Compter les occurrences
-            word_counts = Counter(filtered_words)
-            return word_counts.most_common(top_n)
-
-
-        adolescents_data = valid_responses_copy[valid_responses_copy['Groupe_Simple'] == 'Adolescents'][
-            ai_features_column]
-        adultes_data = valid_responses_copy[valid_responses_copy['Groupe_Simple'] == 'Adultes'][ai_features_column]
-
         col1, col2 = st.columns(2)
 
         with col1:
-            if len(adolescents_data) > 0:
+            if adolescents_count > 0:
                 st.write("**🧑‍🎓 Top mots - Adolescents :**")
-                top_words_ados = get_top_words(adolescents_data, 8)
+                top_words_ados = adolescents_frequencies.most_common(8)
                 for i, (word, count) in enumerate(top_words_ados, 1):
                     st.write(f"{i}. **{word}** ({count} fois)")
 
         with col2:
-            if len(adultes_data) > 0:
+            if adultes_count > 0:
                 st.write("**👨‍👩‍👧‍👦 Top mots - Adultes :**")
-                top_words_adultes = get_top_words(adultes_data, 8)
+                top_words_adultes = adultes_frequencies.most_common(8)
                 for i, (word, count) in enumerate(top_words_adultes, 1):
                     st.write(f"{i}. **{word}** ({count} fois)")
 
@@ -800,10 +511,10 @@ if prevention_column in df.columns and age_category_column in df.columns:
             st.metric("📝 Total", total_adolescents + total_adultes)
 
         # Créer et afficher les graphiques
-        fig = plot_donut_charts(adolescents_counts, adultes_counts)
+        fig = show_chart('donuts', adolescents_counts, adultes_counts)
+        if fig is None:
+            st.warning("Aucune donnée disponible pour créer les graphiques")
         if fig is not None:
-            st.pyplot(fig)
-
             # Ajouter la réponse du participant si disponible
             if valid_code and participant_data is not None:
                 participant_response = participant_data[prevention_column]
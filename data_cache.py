@@ -0,0 +1,297 @@
+# Chargement et cache des données partagés par les applications (micah_sleepscreenai_app.py,
+# cite_des_metiers_app.py, sandbox_app/) : téléchargements regroupés, cache stale-while-revalidate,
+# CSV publiés conditionnels, tableaux en lecture seule, index des participants et fréquences des mots.
+# Ce module ne dépend pas de Streamlit : chaque application garde ses getters @st.cache_resource,
+# qui créent ces objets une fois par processus.
+
+# region imports
+import hashlib
+import io
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+import requests
+# endregion
+
+# region Chargement
+class SingleFlight:
+    """Regroupe les appels concurrents sur une même clé : un seul chargement, résultat partagé."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {"done": threading.Event(), "result": None, "error": None}
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["done"].set()
+
+
+class StaleWhileRevalidateCache:
+    """Sert immédiatement la dernière valeur connue et la rafraîchit en arrière-plan après soft_ttl.
+
+    On ne bloque (sur un seul chargement partagé) que s'il n'y a pas encore de valeur ou si elle dépasse hard_ttl.
+    fetch peut tourner dans un thread d'arrière-plan : il ne doit pas appeler de getter Streamlit.
+    """
+
+    def __init__(self, single_flight):
+        self.single_flight = single_flight
+        self.lock = threading.Lock()
+        self.entries = {}  # clé -> (valeur, date du chargement)
+        self.refreshing = set()
+
+    def get(self, key, fetch, soft_ttl, hard_ttl):
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None or time.time() - entry[1] > hard_ttl:
+            return self.refresh(key, fetch)
+        # Un succès renvoie l'objet en cache lui-même, sans copie
+        check_frame(entry[0])
+
+        if time.time() - entry[1] > soft_ttl:
+            with self.lock:
+                start = key not in self.refreshing
+                self.refreshing.add(key)
+            if start:
+                threading.Thread(target=self._refresh_in_background, args=(key, fetch), daemon=True).start()
+        return entry[0]
+
+    def refresh(self, key, fetch):
+        def fetch_and_store():
+            value = fetch()
+            with self.lock:
+                self.entries[key] = (value, time.time())
+            return value
+
+        return self.single_flight.do(key, fetch_and_store)
+
+    def _refresh_in_background(self, key, fetch):
+        try:
+            self.refresh(key, fetch)
+        except Exception:
+            # On continue à servir l'ancienne valeur ; l'erreur remontera à l'expiration dure
+            pass
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+
+class ConditionalCsvFetcher:
+    """
+    Ne télécharge le CSV publié que s'il a changé, et ne le relit que si son contenu a changé.
+    verify=False ne vérifie pas le certificat du serveur, comme ssl._create_unverified_context pour pd.read_csv.
+    """
+
+    def __init__(self, verify=True):
+        self.verify = verify
+        self.lock = threading.Lock()
+        self.validators = {}  # url -> (ETag, Last-Modified, sha1 du contenu, données lues)
+
+    def fetch(self, url, parse):
+        with self.lock:
+            etag, last_modified, digest, frame = self.validators.get(url, (None, None, None, None))
+
+        headers = {}
+        if frame is not None:
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        response = requests.get(url, headers=headers, timeout=30, verify=self.verify)
+        if response.status_code == 304 and frame is not None:
+            return frame
+        response.raise_for_status()
+
+        # Les feuilles publiées n'envoient pas toujours d'ETag : un contenu identique réutilise les données lues
+        body_digest = hashlib.sha1(response.content).hexdigest()
+        if frame is None or body_digest != digest:
+            frame = parse(io.BytesIO(response.content))
+        with self.lock:
+            self.validators[url] = (
+                response.headers.get('ETag'), response.headers.get('Last-Modified'), body_digest, frame
+            )
+        return frame
+# endregion
+
+# region Données en lecture seule
+def read_only(values):
+    """Copie des valeurs dans laquelle numpy refuse d'écrire."""
+    values = np.array(values, copy=True)
+    values.flags.writeable = False
+    return values
+
+
+def freeze_frame(df):
+    """
+    Version en lecture seule des données chargées. Toutes les sessions reçoivent le même objet (sans copie) :
+    écrire dans une cellule lève une erreur au lieu de modifier les données des autres sessions. Le texte est
+    rangé en tableaux d'objets pour cela (les chaînes Arrow de pandas acceptent l'écriture). Remplacer une
+    colonne ou trier sur place n'écrit dans aucun tableau : check_frame() le détecte à la lecture suivante.
+    Pour dériver un tableau, partir de df.copy(deep=False) : avec le copy-on-write, rien n'est copié avant écriture.
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        values = series.array
+        if isinstance(series.dtype, np.dtype):
+            values = read_only(series.to_numpy())
+        elif isinstance(series.dtype, pd.StringDtype):
+            values = read_only(series.to_numpy(dtype=object))
+        elif isinstance(values, pd.Categorical):
+            values = pd.Categorical.from_codes(read_only(values.codes), dtype=values.dtype)
+        elif isinstance(values, (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+            data = read_only(values.to_numpy(dtype=values.dtype.numpy_dtype, na_value=0))
+            values = type(values)(data, read_only(values.isna()))
+        columns[column] = pd.Series(values, index=df.index, name=column, dtype=values.dtype, copy=False)
+
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    # Ce que check_frame() compare : numpy ne bloque pas l'ajout, le remplacement ou le tri des colonnes sur place
+    frozen.attrs["frozen"] = frame_layout(frozen)
+    return frozen
+
+
+def frame_layout(df):
+    """Colonnes, nombre de lignes, et type et tableau (son adresse, ou l'objet pandas qui l'enveloppe) de chaque colonne."""
+    arrays = []
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, np.dtype):
+            address = series.to_numpy().__array_interface__['data'][0]
+        else:
+            address = id(series.array)
+        arrays.append((str(series.dtype), address))
+    return tuple(df.columns), len(df), tuple(arrays)
+
+
+def check_frame(value):
+    """Renvoie value, après avoir vérifié qu'un tableau figé a toujours ses colonnes, ses lignes et ses tableaux d'origine."""
+    if isinstance(value, pd.DataFrame):
+        expected = value.attrs.get("frozen")
+        if expected is not None and expected != frame_layout(value):
+            raise RuntimeError("Shared survey data was modified in place; derive a frame with df.copy(deep=False)")
+    return value
+# endregion
+
+# region Index des participants
+class DerivedCache:
+    """Valeur dérivée des données chargées, recalculée seulement quand une nouvelle version arrive."""
+
+    def __init__(self, build):
+        self.build = build
+        self.lock = threading.Lock()
+        self.frame = None
+        self.value = None
+
+    def get(self, df):
+        with self.lock:
+            if df is not self.frame:
+                self.value = self.build(df)
+                self.frame = df
+            return self.value
+
+
+def normalize_pseudo(code):
+    """Les pseudos (codes secrets) sont comparés sans espaces autour et sans tenir compte de la casse."""
+    return str(code).strip().upper()
+
+
+def build_participant_index(df, column='Secret_Code'):
+    """Associe chaque pseudo normalisé à la position de sa première ligne."""
+    index = {}
+    if column not in df.columns:
+        return index
+    for position, code in enumerate(df[column].tolist()):
+        if pd.notna(code):
+            index.setdefault(normalize_pseudo(code), position)
+    return index
+# endregion
+
+# region Fréquences des mots
+# Mots exclus des nuages de mots et des listes de "mots les plus fréquents"
+WORD_STOPWORDS = {'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'de', 'du', 'dans', 'avec', 'pour', 'sur',
+                  'par', 'que', 'qui', 'ce', 'cette', 'ces', 'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils',
+                  'elles', 'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'à', 'au', 'aux'}
+
+# Les compteurs sont recalculés en entier à cet intervalle (réponses modifiées ou supprimées dans la feuille)
+WORD_REBUILD_SECONDS = 600
+
+
+def tokenize_words(text):
+    """Mots d'une réponse libre, en minuscules, sans ponctuation, mots courts ni mots vides."""
+    words = re.findall(r'\b\w+\b', str(text).lower())
+    return [word for word in words if len(word) > 2 and word not in WORD_STOPWORDS]
+
+
+class WordFrequencyStore:
+    """
+    Nombre d'occurrences des mots d'une colonne de texte libre, par catégorie brute (category_column),
+    complété avec les lignes ajoutées depuis la dernière synchronisation. Les nuages de mots sont générés
+    à partir de ces fréquences : leur coût suit la taille du vocabulaire, pas la quantité de texte.
+    """
+
+    def __init__(self, column, category_column='Category', rebuild_seconds=WORD_REBUILD_SECONDS):
+        self.column = column
+        self.category_column = category_column
+        self.rebuild_seconds = rebuild_seconds
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # catégorie -> Counter des mots
+        self.word_counts = defaultdict(Counter)
+        self.frame = None
+        self.rows_seen = 0
+        self.last_rebuild = time.time()
+
+    def sync(self, df):
+        """Découpe en mots seulement les lignes ajoutées à df depuis la synchronisation précédente."""
+        with self.lock:
+            if df is self.frame:
+                return
+            # Les données chargées ne font que grandir ; sinon (et de temps en temps) on recalcule tout
+            if len(df) < self.rows_seen or time.time() - self.last_rebuild > self.rebuild_seconds:
+                self.reset()
+
+            new_rows = df.iloc[self.rows_seen:]
+            if self.category_column in new_rows.columns and self.column in new_rows.columns:
+                for category, text in zip(new_rows[self.category_column], new_rows[self.column]):
+                    if pd.isna(category) or pd.isna(text):
+                        continue
+                    self.word_counts[str(category)].update(tokenize_words(text))
+
+            self.frame = df
+            self.rows_seen = len(df)
+
+    def frequencies(self, category, top_n=None):
+        """Mots les plus fréquents des catégories contenant `category` (ex. "Ado"), en Counter."""
+        with self.lock:
+            prefix = category.lower()
+            total = Counter()
+            for cat, counts in self.word_counts.items():
+                if prefix in cat.lower():
+                    total.update(counts)
+        return Counter(dict(total.most_common(top_n)))
+# endregion
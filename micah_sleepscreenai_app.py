@@ -12,17 +12,37 @@ import streamlit as st
 from streamlit_gsheets import GSheetsConnection
 import pandas as pd
 import time
-import matplotlib.pyplot as plt
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from wordcloud import WordCloud
 from datetime import datetime
 import gspread
 from google.oauth2.service_account import Credentials
+from google.auth.exceptions import RefreshError
+import requests
 from collections import Counter
-from wordcloud import WordCloud
 import re
+import threading
+import os
+import uuid
+import hashlib
+import functools
+from collections import OrderedDict
+from results_charts import (
+    new_figure, figure_to_png, count_likert_answers, count_numeric_scale_answers, age_category_stats,
+    WORDCLOUD_OPTIONS
+)
+from render_worker import RenderService
+from data_cache import (
+    SingleFlight, StaleWhileRevalidateCache, ConditionalCsvFetcher, freeze_frame,
+    DerivedCache, normalize_pseudo, build_participant_index, tokenize_words, WordFrequencyStore
+)
+from survey_store import (
+    CATEGORY_OPTIONS, SCREEN_HABIT_OPTIONS, AI_FREQ_OPTIONS, CHATGPT_FEELINGS_OPTIONS, AI_PURPOSE_OPTIONS,
+    AI_BENEFIT_OPTIONS, AI_CONCERN_ITEMS_OPTIONS, AI_RESPONSIBLE_PEOPLE_OPTIONS, AI_PREVENTION_CAMPAIGN_OPTIONS,
+    MULTI_SELECT_OPTIONS, FULL_RESYNC_SECONDS, apply_response_schema, SheetSync,
+    SubmissionWriter, StorageBackend, SQLiteBackend, ReplicatedBackend, CountCube, PseudoRegistry
+)
 # endregion
 
 # region Test de connexion (à supprimer après test)
@@ -40,15 +60,53 @@ import re
 st.set_page_config(page_title="Etude MICAH", layout="centered")
 
 
-# Load service account info from secrets
-service_account_info = st.secrets["gdrive_service_account"]
+class SheetPool:
+    """Authorized gspread client and resolved worksheet handles, shared by the whole process."""
 
-credentials = Credentials.from_service_account_info(
-    service_account_info,
-    scopes=["https://www.googleapis.com/auth/spreadsheets"]
-)
+    def __init__(self, service_account_info):
+        self.service_account_info = service_account_info
+        self.lock = threading.Lock()
+        self.connect()
+
+    def connect(self):
+        credentials = Credentials.from_service_account_info(
+            self.service_account_info,
+            # Drive metadata is only read to know whether the spreadsheet changed (modifiedTime)
+            scopes=["https://www.googleapis.com/auth/spreadsheets",
+                    "https://www.googleapis.com/auth/drive.metadata.readonly"]
+        )
+        # gspread wraps the credentials in an AuthorizedSession, which refreshes the token when it expires
+        self.client = gspread.authorize(credentials)
+        self.worksheets = {}
+
+    def worksheet(self, sheet_id, worksheet_name):
+        with self.lock:
+            key = (sheet_id, worksheet_name)
+            if key not in self.worksheets:
+                self.worksheets[key] = self.client.open_by_key(sheet_id).worksheet(worksheet_name)
+            return self.worksheets[key]
+
+    def run(self, sheet_id, worksheet_name, action, idempotent=True):
+        """Calls action(worksheet), reconnecting and retrying once if the handle went stale."""
+        try:
+            return action(self.worksheet(sheet_id, worksheet_name))
+        except (gspread.exceptions.APIError, RefreshError, requests.exceptions.ConnectionError) as e:
+            if isinstance(e, gspread.exceptions.APIError) and e.response.status_code not in (401, 404):
+                raise
+            # A dropped connection may have hit the server already: never replay a write in that case
+            if isinstance(e, requests.exceptions.ConnectionError) and not idempotent:
+                raise
+            with self.lock:
+                self.connect()
+            return action(self.worksheet(sheet_id, worksheet_name))
+
+
+@st.cache_resource
+def get_sheet_pool():
+    """Builds the credentials and the gspread client once per process instead of once per rerun."""
+    # Load service account info from secrets
+    return SheetPool(dict(st.secrets["gdrive_service_account"]))
 
-client = gspread.authorize(credentials)
 
 SHEET_ID = "1ifQbsvd439slcLIXVlsb0pn0GbAsVMhALHp0hluQS28"
 WORKSHEET_NAME = "Reponses"
@@ -104,10 +162,68 @@ st.markdown("""
 # endregion
 
 # region --- 3. LOAD DATA ---
-@st.cache_data(ttl=0)
+# Incremental sync: only the rows appended since the last call are read from the sheet.
+# Set to False to fall back to a full get_all_records() on every call.
+INCREMENTAL_SYNC = True
+# Stale-while-revalidate: younger than SOFT is served as is, between SOFT and HARD it is served
+# while a background refresh runs, older than HARD blocks the caller until the refresh is done.
+DATA_SOFT_TTL_SECONDS = 5
+DATA_HARD_TTL_SECONDS = 60
+RESULTS_SOFT_TTL_SECONDS = 60
+RESULTS_HARD_TTL_SECONDS = 600
+
+# Columns read by each page; loaders only fetch these instead of the whole sheet (free text included)
+STEP_COLUMNS = {
+    1: ['Secret_Code', 'Category'],
+    3: ['Category', 'Screen_Habit'],
+    6: ['Category', 'AI_Freq', 'AI_Wordcloud_Input'],
+    11: ['Category', 'ChatGPT_Feelings'],
+    20: ['Secret_Code', 'Category', 'Screen_Habit', 'AI_Concern_Scale', 'AI_Wordcloud_Input', 'AI_Prevention_Campaign'],
+}
+
+
+def step_columns(*steps):
+    """Columns declared by the given steps, without duplicates."""
+    columns = []
+    for step in steps:
+        for column in STEP_COLUMNS[step]:
+            if column not in columns:
+                columns.append(column)
+    return tuple(columns)
+
+
+# The survey pages share one frame, loaded at step 1
+KIOSK_COLUMNS = step_columns(1, 3, 6, 11)
+RESULTS_COLUMNS = step_columns(20)
+
+
+@st.cache_resource
+def get_sheet_sync(sheet_id, worksheet_name, columns=None):
+    """One resident frame per worksheet (and projection), shared by every session of the process."""
+    return SheetSync(columns)
+
+
+@st.cache_resource
+def get_single_flight():
+    """Process-wide registry of in-flight loads, shared by every session."""
+    return SingleFlight()
+
+
+@st.cache_resource
+def get_data_cache():
+    """Process-wide stale-while-revalidate cache for survey data."""
+    return StaleWhileRevalidateCache(get_single_flight())
+
+
+@st.cache_resource
+def get_csv_fetcher():
+    """Process-wide conditional fetcher for the published CSV links."""
+    return ConditionalCsvFetcher()
+
+
 #def load_data():
-def load_data(sheet_id, worksheet_name, _gspread_client):
-    """Reads the Google Sheet to get data for the graphs."""
+def read_sheet(sheet_id, worksheet_name, sheet_pool, columns=None):
+    """Reads the Google Sheet to get data for the graphs (only `columns` when given)."""
 
     # V1
     # try:
@@ -119,81 +235,283 @@ def load_data(sheet_id, worksheet_name, _gspread_client):
     #     return pd.DataFrame()
 
     # V2
-    try:
-        # Re-authorize the sheet using the client passed to the function
-        sheet = _gspread_client.open_by_key(sheet_id).worksheet(worksheet_name)
+    # Resolved here, in the script thread, because fetch() may run in a background refresh
+    sheet_sync = get_sheet_sync(sheet_id, worksheet_name, columns)
+
+    def fetch():
+        # V3: only fetch the rows appended since the previous call
+        if INCREMENTAL_SYNC:
+            return sheet_pool.run(sheet_id, worksheet_name, sheet_sync.sync)
+
+        # Get all records as a list of dicts, using the pooled worksheet handle
+        data = sheet_pool.run(sheet_id, worksheet_name, lambda sheet: sheet.get_all_records())
+
+        df = apply_response_schema(pd.DataFrame(data))
+        if columns is not None:
+            df = df[[column for column in df.columns if column in columns]]
+        return freeze_frame(df)
+
+    # Sessions pressing "Commencer" at the same time share a single fetch,
+    # and recent data is served without waiting on the network
+    return get_data_cache().get(
+        ("load_data", sheet_id, worksheet_name, columns), fetch, DATA_SOFT_TTL_SECONDS, DATA_HARD_TTL_SECONDS
+    )
 
-        # Get all records as a list of dicts
-        data = sheet.get_all_records()
 
-        df = pd.DataFrame(data)
-        return df
+def load_data(backend, columns=None):
+    """Reads the responses from the storage backend (only `columns` when given)."""
+    try:
+        return backend.project(columns)
     except Exception as e:
         st.error(f"Erreur de chargement des données: {e}")
         return pd.DataFrame()
 # endregion
 
-# region--- 3. UTILS FUNCTIONS ---
-def save_data_securely(new_data_dict, sheet_id, worksheet_name, _gspread_client):
-    """Appends a new row to the Google Sheet."""
-    try:
-        sheet = _gspread_client.open_by_key(sheet_id).worksheet(worksheet_name)
+# region --- 3. SUBMISSION QUEUE ---
+# Write-behind: submissions are journaled locally, acknowledged, then appended to the sheet in batches.
+# Set to False to append each row synchronously while the participant waits.
+WRITE_BEHIND = True
+JOURNAL_DIR = "./journal"
+
+
+@st.cache_resource
+def get_submission_writer(sheet_id, worksheet_name, _sheet_pool):
+    """One writer (and one journal file) per worksheet for the whole process."""
+    def flush(rows):
+        _sheet_pool.run(
+            sheet_id, worksheet_name,
+            lambda sheet: sheet.append_rows(rows, value_input_option='USER_ENTERED'),
+            idempotent=False
+        )
 
+    journal_path = os.path.join(JOURNAL_DIR, f"{sheet_id}_{worksheet_name}.jsonl")
+    return SubmissionWriter(journal_path, flush)
+# endregion
+
+# region --- 3. STORAGE BACKENDS ---
+# "sheets" (Google Sheets), "sqlite" (local file: large events, benchmarks without network)
+# or "event" (local replica synced with the sheet in the background: venues with unreliable Wi-Fi)
+STORAGE_BACKEND = "sheets"
+SQLITE_PATH = "./local_store/responses.sqlite3"
+EVENT_REPLICA_PATH = "./local_store/event_replica.sqlite3"
+
+
+class SheetsBackend(StorageBackend):
+    """The "Reponses" worksheet: incremental, column-projected reads and write-behind appends."""
+
+    def __init__(self, sheet_id, worksheet_name, sheet_pool):
+        self.name = f"sheets:{sheet_id}/{worksheet_name}"
+        self.sheet_id = sheet_id
+        self.worksheet_name = worksheet_name
+        self.sheet_pool = sheet_pool
+
+    def append(self, responses):
         # gspread.append_row expects a list of values, in the order of the columns.
         # You'll need to define the exact list of column names (headers)
         # to ensure the data is written correctly.
 
         # Example: Ensure all columns are present, fill missing ones with None/""
-        header = list(new_data_dict.keys())  # Or, define your full list of expected column names
-        values_to_append = [new_data_dict.get(col, "") for col in header]  # Get values in order
+        header = list(responses.keys())  # Or, define your full list of expected column names
+        values_to_append = [responses.get(col, "") for col in header]  # Get values in order
 
-        sheet.append_row(values_to_append, value_input_option='USER_ENTERED')
+        if WRITE_BEHIND:
+            # The row is safe on disk once submit() returns; the sheet is written in the background
+            get_submission_writer(self.sheet_id, self.worksheet_name, self.sheet_pool).submit(values_to_append)
+        else:
+            self.sheet_pool.run(
+                self.sheet_id, self.worksheet_name,
+                lambda sheet: sheet.append_row(values_to_append, value_input_option='USER_ENTERED'),
+                idempotent=False
+            )
 
+    def project(self, columns):
+        return read_sheet(self.sheet_id, self.worksheet_name, self.sheet_pool, columns)
+
+    def lookup(self, code):
+        # Restricted to the results page's columns: a full-width read would fetch every free-text answer
+        return find_participant(self.project(RESULTS_COLUMNS), code, self.name)
+
+
+@st.cache_resource
+def get_storage_backend(kind):
+    """The storage backend shared by every session."""
+    if kind == "sqlite":
+        return SQLiteBackend(SQLITE_PATH)
+    if kind == "event":
+        return ReplicatedBackend(EVENT_REPLICA_PATH, SHEET_ID, WORKSHEET_NAME, get_sheet_pool())
+    return SheetsBackend(SHEET_ID, WORKSHEET_NAME, get_sheet_pool())
+
+
+storage = get_storage_backend(STORAGE_BACKEND)
+# endregion
+
+# region--- 3. UTILS FUNCTIONS ---
+def save_data_securely(new_data_dict, backend):
+    """Appends a new row to the storage backend (through the write-behind journal for Google Sheets)."""
+    try:
+        backend.append(new_data_dict)
+
+        # Keep the chart counts up to date without reloading the sheet
+        get_count_cube(backend.name).add_submission(new_data_dict)
+        get_pseudo_registry(backend.name, backend).commit(new_data_dict.get('Secret_Code', ''))
         return True
     except Exception as e:
         st.error(f"Erreur de sauvegarde: {e}")
         return False
 
-#def save_data_securely(new_data_dict):
-    """Reads current data, appends new row, and writes everything back."""
-    # try:
-    #     conn = st.connection("gsheets", type=GSheetsConnection)
-    #
-    #     # 1. Read existing data (No Cache)
-    #     existing_data = conn.read(worksheet="Reponses", ttl=0)
-    #
-    #     # 2. Create new row
-    #     new_row = pd.DataFrame([new_data_dict])
-    #
-    #     # 3. Combine old + new
-    #     # If existing_data is empty, we just start with new_row
-    #     if existing_data.empty:
-    #         updated_df = new_row
-    #     else:
-    #         updated_df = pd.concat([existing_data, new_row], ignore_index=True)
-    #
-    #     # 4. Write back to sheet
-    #     conn.update(worksheet="Reponses", data=updated_df)
-    #     return True
-    # except Exception as e:
-    #     st.error(f"Erreur de sauvegarde: {e}")
-    #     return False
-    
-def get_real_counts(df, category, column, options):
-    """Filters the dataframe by category and counts responses for specific options."""
-    # Safety check: if data is empty or column missing, return zeros
-    if df.empty or column not in df.columns:
-        return [0] * len(options) 
-    
-    # Filter by category (e.g. "Ado" or "Adulte")
-    filtered_df = df[df['Category'].astype(str).str.contains(category[:3], case=False, na=False)]
-    
-    # Count the values
-    counts = filtered_df[column].value_counts()
-    
-    # Ensure every option has a number (even if 0)
-    final_counts = counts.reindex(options, fill_value=0).tolist()
-    return final_counts
+
+def explode_multi_select(df, columns=MULTI_SELECT_OPTIONS):
+    """Parses the comma-joined multi-select columns into a long-form frame (row, column, answer, predefined).
+
+    Predefined options are matched first, as whole answers, because some of them contain commas.
+    Whatever is left in the cell is split on commas and kept as free text ("Autre").
+    """
+    parts = []
+    for column, options in columns.items():
+        if column not in df.columns:
+            continue
+        remaining = df[column].dropna().astype(str)
+        for option in options:
+            pattern = r'(?:^|,)\s*' + re.escape(option) + r'\s*(?=,|$)'
+            selected = remaining.str.contains(pattern, regex=True)
+            parts.append(pd.DataFrame({'row': remaining.index[selected], 'column': column,
+                                       'answer': option, 'predefined': True}))
+            remaining = remaining.str.replace(pattern, '', regex=True)
+
+        free_text = remaining.str.split(',').explode().str.strip()
+        free_text = free_text[free_text.notna() & (free_text != '')]
+        parts.append(pd.DataFrame({'row': free_text.index, 'column': column,
+                                   'answer': free_text.values, 'predefined': False}))
+
+    if not parts:
+        return pd.DataFrame(columns=['row', 'column', 'answer', 'predefined'])
+    long_form = pd.concat(parts, ignore_index=True)
+    long_form['column'] = long_form['column'].astype('category')
+    return long_form
+
+
+def count_multi_select(long_form, column, groups):
+    """Counter of answers per group for one multi-select column: predefined options first, then free text."""
+    answers = long_form[long_form['column'] == column]
+    answers = answers.assign(group=groups.reindex(answers['row']).values)
+    sizes = answers.groupby(['group', 'predefined', 'answer'], observed=True, sort=False).size()
+
+    counters = {}
+    for group in sizes.index.get_level_values('group').unique():
+        group_sizes = sizes.loc[group]
+        counter = Counter()
+        options = MULTI_SELECT_OPTIONS.get(column, [])
+        if True in group_sizes.index.get_level_values('predefined'):
+            predefined = group_sizes.loc[True]
+            for option in options:
+                if option in predefined.index:
+                    counter[option] = int(predefined[option])
+        if False in group_sizes.index.get_level_values('predefined'):
+            for answer, count in group_sizes.loc[False].sort_values(ascending=False).items():
+                counter[answer] += int(count)
+        counters[group] = counter
+    return counters
+
+
+@st.cache_resource
+def get_multi_select_index(source):
+    """Long-form multi-select answers of one data source, parsed once per data version."""
+    return DerivedCache(explode_multi_select)
+
+
+# Question columns charted in steps 3, 6 and 11
+CUBE_COLUMNS = ['Screen_Habit', 'AI_Freq', 'ChatGPT_Feelings']
+
+
+@st.cache_resource
+def get_count_cube(source):
+    """One count cube per storage backend, shared by every session."""
+    return CountCube(CUBE_COLUMNS)
+
+
+count_cube = get_count_cube(storage.name)
+
+
+def get_real_counts(cube, category, column, options):
+    """Reads the counts of a category (e.g. "Ado" or "Adulte") for specific options from the count cube."""
+    # Every option has a number (even if 0)
+    return cube.counts(category, column, options)
+
+
+@st.cache_resource
+def get_word_frequencies(source):
+    """One store of AI_Wordcloud_Input word counts per data source ("kiosk" pages or "results"), shared by every session."""
+    return WordFrequencyStore('AI_Wordcloud_Input', rebuild_seconds=FULL_RESYNC_SECONDS)
+
+
+# WordCloud keeps at most this many words, so the render service only needs the top of the counts
+WORDCLOUD_MAX_WORDS = 200
+
+
+@st.cache_resource
+def get_pseudo_registry(source, _backend):
+    """One pseudo registry per storage backend, shared by every session."""
+    registry = PseudoRegistry()
+    try:
+        # Only the Secret_Code column is read (header row + one column instead of the whole sheet)
+        registry.sync(_backend.project(('Secret_Code',)))
+    except Exception:
+        # The registry is also filled from every loaded frame, so it catches up on the next load
+        pass
+    return registry
+
+
+pseudo_registry = get_pseudo_registry(storage.name, storage)
+
+
+@st.cache_resource
+def get_participant_index(source):
+    """Pseudo -> row position of one data source, rebuilt once per data version."""
+    return DerivedCache(build_participant_index)
+
+
+def find_participant(df, code, source):
+    """Returns the participant's row (or None) with a dict lookup instead of scanning the column."""
+    position = get_participant_index(source).get(df).get(normalize_pseudo(code))
+    return None if position is None else df.iloc[position]
+
+
+class SharedSurveyData:
+    """
+    Latest kiosk responses, shared by every session. Sessions keep no copy of the responses, so their
+    memory does not grow with the sheet, and the aggregates are synced once per new frame, not per session.
+    A published frame is never modified (freeze_frame), so sessions read it without a lock.
+    """
+
+    def __init__(self, listeners):
+        self.listeners = listeners  # called with each new frame (count cube, pseudos, word counts)
+        self.lock = threading.Lock()
+        self.frame = pd.DataFrame()
+
+    def publish(self, df):
+        """Makes df the current frame if it is a new one."""
+        with self.lock:
+            if df is self.frame:
+                return
+            # A failed load (empty frame) keeps serving the previous frame
+            if df.empty and not self.frame.empty:
+                return
+            for listener in self.listeners:
+                listener(df)
+            self.frame = df
+
+    def get(self):
+        """The current frame; every session reads the latest published one."""
+        return self.frame
+
+
+@st.cache_resource
+def get_survey_data(source):
+    """One shared set of responses per storage backend."""
+    return SharedSurveyData([count_cube.sync, pseudo_registry.sync, get_word_frequencies("kiosk").sync])
+
+
+survey_data = get_survey_data(storage.name)
 
 def next_step():
     st.session_state.step += 1
@@ -202,6 +520,164 @@ def next_step():
 def toggle_compare():
     st.session_state.compare_mode = not st.session_state.compare_mode
 
+# Navigation buttons use these as on_click callbacks: Streamlit runs the callback before the script, so the
+# click's own run already shows the new step (one script execution per click instead of two with st.rerun()).
+# Callbacks read the page's widgets from st.session_state through their keys.
+def go_next(collect=None, warning="Choix requis."):
+    """
+    Stores the answers returned by collect() and moves to the next step.
+    collect() returns None if the page cannot be left yet; `warning` is then shown under the button.
+    """
+    answers = collect() if collect is not None else {}
+    if answers is None:
+        st.session_state.nav_message = ("warning", warning)
+        return
+    st.session_state.responses.update(answers)
+    next_step()
+
+def go_to_step(step):
+    st.session_state.step = step
+    st.session_state.compare_mode = False
+
+def show_nav_message():
+    """Shows, once, the message left by a navigation callback (e.g. a missing answer)."""
+    message = st.session_state.pop('nav_message', None)
+    if message:
+        kind, text = message
+        getattr(st, kind)(text)
+
+def multiselect_answer(key):
+    """
+    Selected options of the multiselect `key` without "Autre", plus the text typed for "Autre"
+    (text_input `key`_other, only shown while "Autre" is selected), as stored in the responses.
+    """
+    selected = st.session_state.get(key, [])
+    other_text = st.session_state.get(f"{key}_other", "") if "Autre" in selected else ""
+    final_list = [p for p in selected if p != "Autre"]
+    if other_text: final_list.append(other_text) # Just store text for wordcloud later
+    return final_list, other_text
+
+def start_survey(storage):
+    """'Commencer': loads the shared responses, reserves the pseudo and goes to the first question."""
+    code = st.session_state.get('secret_code_input')
+    role = st.session_state.get('category_input')
+    if not (code and role):
+        st.session_state.nav_message = ("warning", "Veuillez remplir tous les champs.")
+        return
+    # Load the data for the graphs (served from the shared cache) and publish it to every session
+    survey_data.publish(load_data(storage, KIOSK_COLUMNS))
+
+    # Check the pseudo and hold it for this session in one step
+    if not pseudo_registry.reserve(code, st.session_state.session_id):
+        st.session_state.nav_message = ("error", "Ce pseudo est déjà pris. Veuillez en choisir un autre.")
+        return
+    # Pseudo is available, proceed
+    st.session_state.responses['Secret_Code'] = code
+    st.session_state.responses['Category'] = role
+    next_step()
+
+def submit_responses(storage):
+    """'Envoyer mes réponses': saves the responses once and goes to the thank-you page."""
+    with st.spinner("Envoi en cours..."):
+        # Add timestamp
+        st.session_state.responses['Timestamp'] = datetime.now().isoformat()
+        success = save_data_securely(st.session_state.responses, storage)
+    if success:
+        st.session_state.data_submitted = True
+        st.session_state.show_balloons = True # Celebrated once, on the next page
+        next_step()
+    else:
+        st.session_state.nav_message = ("error", "Erreur de sauvegarde.")
+
+def restart_survey():
+    st.session_state.step = 1
+    st.session_state.responses = {}
+
+# Questions of the pages without visualization. Asked one page per step, or with FORM_BATCH_MODE, consecutive
+# ones together in a single st.form: nothing is sent to the server until "Continuer", so a batch costs one run.
+FORM_BATCH_MODE = False
+# First step of a batch: (progress, steps asked in its form); the next page is the step after the last one
+QUESTION_BATCHES = {
+    8: (36, (8, 9, 10)),
+    12: (66, (12, 13, 14, 15, 16, 17)),
+}
+
+def ask_multiselect(key, options, in_form=False):
+    selected = st.multiselect("", options + ["Autre"], key=key)
+    # In a form the selection is only known on submit, so the field for "Autre" is always shown
+    if in_form or "Autre" in selected:
+        st.text_input("Précisez pour 'Autre' :", key=f"{key}_other")
+
+def ask_scale(key, low_label, high_label):
+    st.select_slider("", options=list(range(1, 11)), value=5, key=key)
+    # Custom labels below the slider
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.write(f"**{low_label}**")
+    with col3:
+        st.write(f"**{high_label}**")
+
+def multiselect_collector(key, column):
+    """Answer of ask_multiselect(key); None if "Autre" is selected but not specified."""
+    def collect():
+        final_list, other_text = multiselect_answer(key)
+        if "Autre" in st.session_state.get(key, []) and not other_text:
+            return None
+        return {column: ", ".join(final_list)}
+    return collect
+
+# step: (question, ask(in_form), collect() -> answers or None)
+QUESTIONS = {
+    8: ("#### Quels sont les avantages (bénéfices?) de l'IA pour vous ?",
+        lambda in_form: ask_multiselect('ai_benefit', AI_BENEFIT_OPTIONS, in_form),
+        multiselect_collector('ai_benefit', 'AI_Benefit')),
+    9: ("#### Dans quelle mesure pensez-vous que les IA apportent des avantages ?",
+        lambda in_form: ask_scale('ai_benefit_scale', "Les IA n'apportent aucun avantages", "Les IA apporteront toujours des avantages"),
+        lambda: {'AI_Benefit_Scale': st.session_state.ai_benefit_scale}),
+    10: ("#### Avez-vous déjà parlé de vos sentiments avec une IA ?",
+         lambda in_form: st.radio("", CHATGPT_FEELINGS_OPTIONS, horizontal=False, key="chatgpt_feelings"),
+         lambda: {'ChatGPT_Feelings': st.session_state.chatgpt_feelings}),
+    12: ("#### Dans quelle mesure êtes-vous préoccupé.e.s par les IA ?",
+         lambda in_form: ask_scale('ai_concern_scale', "Les IA ne me causent aucun souci", "Les IA me causent beaucoup d'inquiétude"),
+         lambda: {'AI_Concern_Scale': st.session_state.ai_concern_scale}),
+    13: ("#### Quels sont vos inquiétudes par rapport à l'IA ?",
+         lambda in_form: ask_multiselect('ai_concern_items', AI_CONCERN_ITEMS_OPTIONS, in_form),
+         multiselect_collector('ai_concern_items', 'AI_Concern_Items')),
+    14: ("#### Selon vous, qui est le plus responsable de l'enseignement des compétences dans les IA ?",
+         lambda in_form: ask_multiselect('ai_responsible_people', AI_RESPONSIBLE_PEOPLE_OPTIONS, in_form),
+         multiselect_collector('ai_responsible_people', 'AI_Responsible_People')),
+    15: ("#### Quelle fonctionnalité aimeriez-vous implémenter dans l'IA ?",
+         lambda in_form: st.text_input("Ecrivez toutes vos idées", key = "ai_feature"),
+         lambda: {'AI_Feature': st.session_state.ai_feature}),
+    16: ("#### Les campagnes de prévention sont trop sérieuses, parmi les éléments suivants, lesquels t’aideraient à mieux comprendre les informations sur la bonne utilisation et la sécurité des IA?",
+         lambda in_form: ask_multiselect('ai_prevention_campaign', AI_PREVENTION_CAMPAIGN_OPTIONS, in_form),
+         multiselect_collector('ai_prevention_campaign', 'AI_Prevention_Campaign')),
+    17: ("#### Laissez-nous vos remarques et commentaires :",
+         lambda in_form: st.text_input("", key="ai_comments"),
+         lambda: {'AI_Comments': st.session_state.ai_comments}),
+}
+OTHER_MISSING_WARNING = "Précisez votre réponse pour 'Autre'."
+
+def ask_question(step, in_form=False):
+    question, ask, _ = QUESTIONS[step]
+    st.markdown(question)
+    ask(in_form)
+
+def submit_batch(steps):
+    """'Continuer' of a batch form: checks all its answers together, then stores them and skips the batch."""
+    answers, missing = {}, []
+    for number, step in enumerate(steps, start=1):
+        step_answers = QUESTIONS[step][2]()
+        if step_answers is None:
+            missing.append(str(number))
+        else:
+            answers.update(step_answers)
+    if missing:
+        st.session_state.nav_message = ("warning", f"Question {', '.join(missing)} : {OTHER_MISSING_WARNING}")
+        return
+    st.session_state.responses.update(answers)
+    go_to_step(steps[-1] + 1)
+
 def save_to_google_sheets(data):
     try:
         conn = st.connection("gsheets", type=GSheetsConnection)
@@ -215,6 +691,61 @@ def save_to_google_sheets(data):
 # endregion
 
 # region--- 4. GRAPH FUNCTIONS ---
+# Figures kept for reuse across reruns and sessions (least recently used are dropped first)
+FIGURE_CACHE_SIZE = 256
+
+
+class FigureCache:
+    """Bounded LRU of built figures, keyed by everything the figure is built from."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key, build):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        figure = build()
+        with self.lock:
+            self.entries[key] = figure
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return figure
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide figure cache shared by every session."""
+    return FigureCache(FIGURE_CACHE_SIZE)
+
+
+def freeze(value):
+    """Hashable version of the arguments (lists of options or counts become tuples)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    return value
+
+
+def cached_figure(builder):
+    """
+    Returns the figure already built for the same inputs instead of building it again.
+    The counts are part of the key, so a new data version (or the compare mode) gives a new figure.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (builder.__name__, freeze(args), freeze(kwargs))
+        return get_figure_cache().get(key, lambda: builder(*args, **kwargs))
+    return wrapper
+
+
+@cached_figure
 def plot_likert(user_choice, options, data_my_group, data_other_group=None, my_group_name="Mon Groupe", other_group_name="Autre"):
     """
     Generates a horizontal Likert-style bar chart using Plotly.
@@ -291,6 +822,7 @@ def plot_likert(user_choice, options, data_my_group, data_other_group=None, my_g
     )
     return fig
 
+@cached_figure
 def plot_donut(user_choice, options, data_my_group, data_other_group=None, my_group_name="Mon Groupe"):
     """
     Generates a Ring Plot (Donut) for percentages.
@@ -325,6 +857,184 @@ def plot_donut(user_choice, options, data_my_group, data_other_group=None, my_gr
     )
     return fig
 
+
+@st.fragment
+def likert_panel(title, column, options, compare_label):
+    """
+    Likert chart of the user's answer with its compare toggle (steps 3 and 6).
+    Runs as a fragment: the toggle reruns only this panel, not the page around it (images, word cloud...).
+    `title` may use {user_role}.
+    """
+    user_role = st.session_state.responses['Category']
+    other_role = "Adulte" if user_role.startswith("Ado") else "Ado (11-17 ans)"
+
+    my_counts = get_real_counts(count_cube, user_role, column, options)
+    # Get comparison counts if mode is active
+    other_counts = get_real_counts(count_cube, other_role, column, options) if st.session_state.compare_mode else None
+
+    st.markdown(f"<div class='css-card'><h4>{title.format(user_role=user_role)}</h4>", unsafe_allow_html=True)
+    fig = plot_likert(st.session_state.responses[column], options, my_counts, other_counts, user_role, other_role)
+    st.plotly_chart(fig, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    st.button(compare_label, on_click=toggle_compare)
+
+
+def plot_micah_activities():
+    """MICAH cohort results on the activities before falling asleep (constant study data)."""
+    activities = ['Envoyer des messages aux ami.e.s', 'Vérifier les réseaux sociaux', 'Regarder des vidéos sur Youtube', 'Lire sur un livre/kindle', 'Jouer à des jeux vidéo hors ligne', 'Jouer à des jeux non numériques', 'Publier sur les réseaux sociaux']
+    percentages = [81.03, 77.97, 75.18, 66.73, 42.81, 41.10, 39.57]
+    sorted_indices = np.argsort(percentages)
+    activities = [activities[i] for i in sorted_indices]
+    percentages = [percentages[i] for i in sorted_indices]
+
+    fig, ax = new_figure(figsize=(8, 4))
+    fig.patch.set_facecolor('#1E1E1E')
+    ax.set_facecolor('#1E1E1E')
+    bars = ax.barh(activities, percentages, color='#4A90E2', height=0.6)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    ax.spines['bottom'].set_color('white')
+    ax.tick_params(axis='x', colors='white')
+    ax.tick_params(axis='y', colors='white', length=0)
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width + 1, bar.get_y() + bar.get_height()/2, f'{width}%', ha='left', va='center', color='white', fontsize=9)
+    return fig
+
+
+# Charts built only from constant data ("Point Info" pages): rendered once, then served as PNG bytes
+STATIC_CHARTS = {
+    'micah_activities': plot_micah_activities,
+}
+
+
+@st.cache_resource
+def get_static_chart(name):
+    """PNG bytes of a static chart, rendered once for the whole process."""
+    return figure_to_png(STATIC_CHARTS[name]())
+
+
+# Render the static charts at startup so no participant waits for matplotlib
+for static_chart in STATIC_CHARTS:
+    get_static_chart(static_chart)
+
+
+# Word clouds and results charts are rendered in worker processes, so they neither hold the GIL
+# of the script threads nor make one session wait for another. 0 renders in the script thread.
+RENDER_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+RENDER_QUEUE_SIZE = 8  # renders allowed to wait for a worker; beyond that, callers wait for a slot
+RENDER_TIMEOUT_SECONDS = 30  # for a slot and the render together
+
+
+@st.cache_resource
+def get_render_service():
+    """Process-wide render pool shared by every session."""
+    return RenderService(RENDER_WORKERS, RENDER_QUEUE_SIZE, RENDER_TIMEOUT_SECONDS)
+
+
+# Start the workers with the server, so the first results page does not wait for them
+get_render_service().start()
+
+
+# Rendered word clouds kept in memory (least recently used dropped first), and optionally on disk
+WORDCLOUD_CACHE_SIZE = 64
+WORDCLOUD_CACHE_DIR = None  # e.g. "./local_store/wordclouds" to keep them across restarts
+WORDCLOUD_CACHE_DISK_ENTRIES = 1024
+
+
+class ImageCache(FigureCache):
+    """FigureCache of PNG bytes keyed by a digest, with an optional directory behind the memory tier."""
+
+    def __init__(self, max_entries, directory=None, max_files=0):
+        super().__init__(max_entries)
+        self.directory = directory
+        self.max_files = max_files
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key, build):
+        return super().get(key, lambda: self.read(key) or self.write(key, build()))
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.png")
+
+    def read(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                png = f.read()
+            os.utime(self.path(key))  # recently used: pruned last
+            return png
+        except OSError:
+            return None
+
+    def write(self, key, png):
+        if not self.directory or not png:
+            return png
+        try:
+            # Written under a temporary name then renamed, so a reader never sees half a file
+            tmp_path = f"{self.path(key)}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, self.path(key))
+            self.prune()
+        except OSError:
+            # Disk full or read-only: the memory tier still serves the image
+            pass
+        return png
+
+    def prune(self):
+        files = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".png")]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - self.max_files]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+@st.cache_resource
+def get_wordcloud_cache():
+    """Process-wide cache of rendered word clouds shared by every session."""
+    return ImageCache(WORDCLOUD_CACHE_SIZE, WORDCLOUD_CACHE_DIR, WORDCLOUD_CACHE_DISK_ENTRIES)
+
+
+def image_digest(group, chart, *args):
+    """Key of a rendered image: the group it shows and the chart spec (frequency tables, size, colormap...)."""
+    # The step 20 clouds take their size and colormaps from WORDCLOUD_OPTIONS rather than from the spec
+    spec = (group, chart, freeze(args), freeze(WORDCLOUD_OPTIONS))
+    return hashlib.sha1(repr(spec).encode("utf-8")).hexdigest()
+
+
+def show_chart(chart, *args, group=None):
+    """
+    Renders the chart off the script thread and shows it, with a placeholder while it is pending.
+    With a group, the image is served from the word cloud cache, so it is only laid out once per data change.
+    Returns the PNG bytes, None when the chart has nothing to show, False when the render timed out.
+    """
+    placeholder = st.empty()
+    placeholder.info("⏳ Génération du graphique...")
+    try:
+        if group is None:
+            png = get_render_service().render(chart, *args)
+        else:
+            png = get_wordcloud_cache().get(image_digest(group, chart, *args),
+                                            lambda: get_render_service().render(chart, *args))
+    except TimeoutError:
+        placeholder.warning("⏳ Le graphique met trop de temps à s'afficher, réessaie dans un instant.")
+        return False
+
+    if png is None:
+        placeholder.empty()
+    else:
+        placeholder.image(png, use_container_width=True)
+    return png
+
 # endregion
 
 
@@ -335,57 +1045,53 @@ if 'responses' not in st.session_state:
     st.session_state.responses = {}
 if 'compare_mode' not in st.session_state:
     st.session_state.compare_mode = False
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 # endregion
 
 # region --- 6. MAIN APP FLOW ---
 
 with st.container():
+    # ==========================
+    # region BATCHED QUESTIONS (FORM_BATCH_MODE)
+    # ==========================
+    if FORM_BATCH_MODE and st.session_state.step in QUESTION_BATCHES:
+        progress, steps = QUESTION_BATCHES[st.session_state.step]
+        st.progress(progress)
+        st.title("Vos avis sur les Intelligences Artificielles")
+        st.image(
+            "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
+            use_container_width=True)
+
+        with st.form(f"questions_{st.session_state.step}"):
+            for step in steps:
+                ask_question(step, in_form=True)
+            st.form_submit_button("Continuer ➡️", on_click=submit_batch, args=(steps,))
+        show_nav_message()
+    # endregion
+
     # ==========================
     # region STEP 1: ID
     # ==========================
-    if st.session_state.step == 1:
+    elif st.session_state.step == 1:
         st.image("./images/image_accueil.png", use_container_width=True)
         st.title("Partage ton avis sur le sommeil, les écrans et les IA")
         #st.markdown("<div class='css-card'>", unsafe_allow_html=True)
         st.markdown("### 1. Identifiez-vous")
-        code = st.text_input("Choisissez un pseudo (ex: PIZZA99)")
-        role = st.radio("Vous êtes :", ["Ado (11-17 ans)", "Adulte"], index=None)
+        st.text_input("Choisissez un pseudo (ex: PIZZA99)", key="secret_code_input")
+        st.radio("Vous êtes :", CATEGORY_OPTIONS, index=None, key="category_input")
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Commencer"):
-            if code and role:
-                # Load the data to check for existing pseudos
-                st.session_state.sheet_data = load_data(SHEET_ID, WORKSHEET_NAME, client)
-
-                # Check if the pseudo already exists
-                if 'Secret_Code' in st.session_state.sheet_data.columns:
-                    existing_codes = st.session_state.sheet_data['Secret_Code'].astype(str).str.upper()
-                    if code.upper() in existing_codes.values:
-                        st.error("Ce pseudo est déjà pris. Veuillez en choisir un autre.")
-                    else:
-                        # Pseudo is available, proceed
-                        st.session_state.responses['Secret_Code'] = code
-                        st.session_state.responses['Category'] = role
-                        next_step()
-                        st.rerun()
-                else:
-                    # If column doesn't exist yet (empty sheet), proceed
-                    st.session_state.responses['Secret_Code'] = code
-                    st.session_state.responses['Category'] = role
-                    next_step()
-                    st.rerun()
-            else:
-                st.warning("Veuillez remplir tous les champs.")
+        st.button("Commencer", on_click=start_survey, args=(storage,))
+        show_nav_message()
 
-        if st.button("Voir les résultats"):
-            st.session_state.step = 20
-            st.rerun()
+        st.button("Voir les résultats", on_click=go_to_step, args=(20,))
         # if st.button("Commencer"):
         #     if code and role:
         #         st.session_state.responses['Secret_Code'] = code
         #         st.session_state.responses['Category'] = role
         #         #st.session_state.sheet_data = load_data()
-        #         st.session_state.sheet_data = load_data(SHEET_ID, WORKSHEET_NAME, client)
+        #         st.session_state.sheet_data = load_data(SHEET_ID, WORKSHEET_NAME, sheet_pool)
         #         next_step()
         #         st.rerun()
         #     else:
@@ -402,16 +1108,15 @@ with st.container():
 
         #st.markdown("<div class='css-card'>", unsafe_allow_html=True)
         st.markdown("#### Regardez-vous des écrans avant de dormir ?")
-        screens = st.radio("", ["Jamais", "Parfois", "Souvent", "Tous les soirs"], index=None)
+        st.radio("", SCREEN_HABIT_OPTIONS, index=None, key="screen_habit_input")
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            if screens:
-                st.session_state.responses['Screen_Habit'] = screens
-                next_step()
-                st.rerun()
-            else:
-                st.warning("Choix requis.")
+        def collect_screen_habit():
+            screens = st.session_state.get('screen_habit_input')
+            return {'Screen_Habit': screens} if screens else None
+
+        st.button("Continuer ➡️", on_click=go_next, args=(collect_screen_habit,))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -422,34 +1127,11 @@ with st.container():
         st.progress(12)
         st.title("📊 Résultats : Ecran & Sommeil")
         
-        user_role = st.session_state.responses['Category']
-        other_role = "Adulte" if user_role.startswith("Ado") else "Ado (11-17 ans)"
-        
         # --- NEW REAL DATA LOGIC ---
-        options = ["Jamais", "Parfois", "Souvent", "Tous les soirs"]
-        
-        # Get counts from the loaded sheet data
-        my_counts = get_real_counts(st.session_state.sheet_data, user_role, 'Screen_Habit', options)
-        
-        # Get comparison counts if mode is active
-        other_counts = get_real_counts(st.session_state.sheet_data, other_role, 'Screen_Habit', options) if st.session_state.compare_mode else None
-        
-        st.markdown(f"<div class='css-card'><h4>Votre groupe : {user_role}</h4>", unsafe_allow_html=True)
-        # Use 'my_counts' instead of 'my_data'
-        fig = plot_likert(st.session_state.responses['Screen_Habit'], options, my_counts, other_counts, user_role, other_role)
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+        likert_panel("Votre groupe : {user_role}", 'Screen_Habit', SCREEN_HABIT_OPTIONS, "🔄 Comparer Groupes")
         # ---------------------------
 
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("🔄 Comparer Groupes"):
-                toggle_compare()
-                st.rerun()
-        with col2:
-            if st.button("Continuer ➡️"):
-                next_step()
-                st.rerun()
+        st.button("Continuer ➡️", on_click=go_next)
     # endregion
 
     # ==========================
@@ -474,31 +1156,10 @@ with st.container():
         st.markdown("<div class='css-card'><h4>Données de l'étude MICAH</h4><p>Voici les résultats de la cohorte MICAH concernant les activités avant l'endormissement.</p>", unsafe_allow_html=True)
         #st.image("https://images.unsplash.com/photo-1516321318423-f06f85e504b3?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80", use_container_width=True)
         
-        activities = ['Envoyer des messages aux ami.e.s', 'Vérifier les réseaux sociaux', 'Regarder des vidéos sur Youtube', 'Lire sur un livre/kindle', 'Jouer à des jeux vidéo hors ligne', 'Jouer à des jeux non numériques', 'Publier sur les réseaux sociaux']
-        percentages = [81.03, 77.97, 75.18, 66.73, 42.81, 41.10, 39.57]
-        sorted_indices = np.argsort(percentages)
-        activities = [activities[i] for i in sorted_indices]
-        percentages = [percentages[i] for i in sorted_indices]
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        fig.patch.set_facecolor('#1E1E1E')
-        ax.set_facecolor('#1E1E1E')
-        bars = ax.barh(activities, percentages, color='#4A90E2', height=0.6)
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_visible(False)
-        ax.spines['bottom'].set_color('white')
-        ax.tick_params(axis='x', colors='white')
-        ax.tick_params(axis='y', colors='white', length=0)
-        for bar in bars:
-            width = bar.get_width()
-            ax.text(width + 1, bar.get_y() + bar.get_height()/2, f'{width}%', ha='left', va='center', color='white', fontsize=9)
-        st.pyplot(fig)
+        st.image(get_static_chart('micah_activities'), use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next)
     # endregion
 
 
@@ -512,25 +1173,24 @@ with st.container():
 
         st.markdown("#### A quelle fréquence utilisez-vous l'IA ?")
         #ai_freq = st.select_slider("", options=["Jamais", "Rarement", "Hebdomadaire", "Souvent", "Tous les jours"])
-        ai_freq = st.radio("", options=["Jamais", "Rarement", "Hebdomadaire", "Souvent", "Tous les jours"])
+        st.radio("", options=AI_FREQ_OPTIONS, key="ai_freq")
 
         st.markdown("#### Dans quel but ?", unsafe_allow_html=True)
-        ai_purpose = st.multiselect("", ["Travail / Devoirs", "Loisirs", "Recherche d'info", "Compagnon virtuel", "Soutien psychologique", "Autre"])
+        ai_purpose = st.multiselect("", AI_PURPOSE_OPTIONS + ["Autre"], key="ai_purpose")
         
-        ai_other_text = ""
         if "Autre" in ai_purpose:
-            ai_other_text = st.text_input("Précisez pour 'Autre' :")
+            st.text_input("Précisez pour 'Autre' :", key="ai_purpose_other")
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            final_purpose_list = [p for p in ai_purpose if p != "Autre"]
-            if ai_other_text: final_purpose_list.append(ai_other_text) # Just store text for wordcloud later
-            
-            st.session_state.responses['AI_Freq'] = ai_freq
-            st.session_state.responses['AI_Purpose'] = ", ".join(final_purpose_list)
-            st.session_state.responses['AI_Wordcloud_Input'] = f'{" ".join(final_purpose_list)} {ai_other_text}' if ai_other_text else " ".join(final_purpose_list) # Dummy default
-            next_step()
-            st.rerun()
+        def collect_ai_usage():
+            final_purpose_list, ai_other_text = multiselect_answer('ai_purpose')
+            return {
+                'AI_Freq': st.session_state.ai_freq,
+                'AI_Purpose': ", ".join(final_purpose_list),
+                'AI_Wordcloud_Input': f'{" ".join(final_purpose_list)} {ai_other_text}' if ai_other_text else " ".join(final_purpose_list), # Dummy default
+            }
+
+        st.button("Continuer ➡️", on_click=go_next, args=(collect_ai_usage,))
     # endregion
 
     # ==========================
@@ -541,18 +1201,10 @@ with st.container():
         st.title("📊 Usage de l'IA")
         
         user_role = st.session_state.responses['Category']
-        other_role = "Adulte" if user_role.startswith("Ado") else "Ado (11-17 ans)"
         
         # --- NEW REAL DATA LOGIC ---
-        options = ["Jamais", "Rarement", "Hebdomadaire", "Souvent", "Tous les jours"]
-        
-        my_counts = get_real_counts(st.session_state.sheet_data, user_role, 'AI_Freq', options)
-        other_counts = get_real_counts(st.session_state.sheet_data, other_role, 'AI_Freq', options) if st.session_state.compare_mode else None
-        
-        st.markdown("<div class='css-card'><h4>Fréquence d'utilisation</h4>", unsafe_allow_html=True)
-        fig_freq = plot_likert(st.session_state.responses['AI_Freq'], options, my_counts, other_counts, user_role, other_role)
-        st.plotly_chart(fig_freq, use_container_width=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+        # Fragment: comparing the groups does not regenerate the word cloud below
+        likert_panel("Fréquence d'utilisation", 'AI_Freq', AI_FREQ_OPTIONS, "🔄 Comparer")
         # ---------------------------
         
         # Wordcloud logic - Aggregate ALL responses
@@ -560,44 +1212,28 @@ with st.container():
         #text = st.session_state.responses.get('AI_Wordcloud_Input', '') * 5
         #text = st.session_state.responses.get('AI_Wordcloud_Input', '')
 
-        # Get all AI_Wordcloud_Input responses from the sheet
-        if not st.session_state.sheet_data.empty and 'AI_Wordcloud_Input' in st.session_state.sheet_data.columns:
+        # Word counts of all AI_Wordcloud_Input responses, kept up to date at step 1
+        sheet_data = survey_data.get()
+        if not sheet_data.empty and 'AI_Wordcloud_Input' in sheet_data.columns:
             # Filter by user's category (optional - remove if you want ALL responses regardless of category)
-            filtered_df = st.session_state.sheet_data[
-                st.session_state.sheet_data['Category'].astype(str).str.contains(user_role[:3], case=False, na=False)
-            ]
-
-            # Combine all text from the column
-            all_text = ' '.join(filtered_df['AI_Wordcloud_Input'].dropna().astype(str).tolist())
+            frequencies = get_word_frequencies("kiosk").frequencies(user_role[:3])
 
             # Add current user's response
-            all_text += ' ' + st.session_state.responses.get('AI_Wordcloud_Input', '')
+            frequencies.update(tokenize_words(st.session_state.responses.get('AI_Wordcloud_Input', '')))
         else:
             # Fallback to just current user's response if sheet is empty
-            all_text = st.session_state.responses.get('AI_Wordcloud_Input', 'Travail Loisirs')
+            frequencies = Counter(tokenize_words(st.session_state.responses.get('AI_Wordcloud_Input', 'Travail Loisirs')))
 
         # Generate wordcloud
-        if all_text.strip():  # Only generate if there's text
-            wordcloud = WordCloud(width=800, height=400, background_color='#1E1E1E', colormap='Blues').generate(all_text)
-            fig_wc, ax = plt.subplots()
-            ax.imshow(wordcloud, interpolation='bilinear')
-            ax.axis("off")
-            fig_wc.patch.set_facecolor('#1E1E1E')
-            st.pyplot(fig_wc)
+        if frequencies:  # Only generate if there are words
+            show_chart('wordcloud', dict(frequencies.most_common(WORDCLOUD_MAX_WORDS)),
+                       800, 400, '#1E1E1E', 'Blues', group=user_role[:3])
         else:
             st.info("Pas encore assez de données pour générer un nuage de mots.")
 
         st.markdown("</div>", unsafe_allow_html=True)
 
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("🔄 Comparer"):
-                toggle_compare()
-                st.rerun()
-        with col2:
-            if st.button("Continuer ➡️"):
-                next_step()
-                st.rerun()
+        st.button("Continuer ➡️", on_click=go_next)
     # endregion
 
     # ==========================
@@ -623,9 +1259,7 @@ with st.container():
         """, unsafe_allow_html=True)
 
         # See results
-        if st.button("Continuer ➡️"):
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next)
 
 
     # ==========================
@@ -639,22 +1273,11 @@ with st.container():
             use_container_width=True)  #
 
         #st.markdown("<div class='css-card'>", unsafe_allow_html=True)
-        st.markdown("#### Quels sont les avantages (bénéfices?) de l'IA pour vous ?")
-        ai_benefit = st.multiselect("", ["Pratique / Utile", "Rapide", "Ne me juge pas", "Suscite l'inspiration",
-                                         "Sentiment d'accomplissement", "Pas de bénéfices", "Autre"])
-
-        ai_other_text = ""
-        if "Autre" in ai_benefit:
-            ai_other_text = st.text_input("Précisez pour 'Autre' :")
+        ask_question(8)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            final_purpose_list = [p for p in ai_benefit if p != "Autre"]
-            if ai_other_text: final_purpose_list.append(ai_other_text)  # Just store text for wordcloud later
-
-            st.session_state.responses['AI_Benefit'] = ", ".join(final_purpose_list)
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[8][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -668,20 +1291,10 @@ with st.container():
             use_container_width=True)  #
 
         #st.markdown("<div class='css-card'>", unsafe_allow_html=True)
-        st.markdown("#### Dans quelle mesure pensez-vous que les IA apportent des avantages ?")
-        ai_benefit_scale = st.select_slider("", options=list(range(1, 11)), value=5)
-        # Custom labels below the slider
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col1:
-            st.write("**Les IA n'apportent aucun avantages**")
-        with col3:
-            st.write("**Les IA apporteront toujours des avantages**")
-
-
-        if st.button("Continuer ➡️"):
-            st.session_state.responses['AI_Benefit_Scale'] = ai_benefit_scale
-            next_step()
-            st.rerun()
+        ask_question(9)
+
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[9][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -692,14 +1305,11 @@ with st.container():
         st.title("Emotions & Intelligences Artificielles")
         st.image("https://images.unsplash.com/photo-1516387938699-a93567ec168e?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80", use_container_width=True)
         #st.markdown("<div class='css-card'>", unsafe_allow_html=True)
-        st.markdown("#### Avez-vous déjà parlé de vos sentiments avec une IA ?")
-        chatgpt_feelings = st.radio("", ["Oui", "Non", "Je ne sais pas"], horizontal=False)
+        ask_question(10)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            st.session_state.responses['ChatGPT_Feelings'] = chatgpt_feelings
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[10][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -713,16 +1323,14 @@ with st.container():
         user_role = st.session_state.responses['Category']
 
         # --- NEW REAL DATA LOGIC ---
-        options = ["Oui", "Non", "Je ne sais pas"]
-        my_counts = get_real_counts(st.session_state.sheet_data, user_role, 'ChatGPT_Feelings', options)
+        options = CHATGPT_FEELINGS_OPTIONS
+        my_counts = get_real_counts(count_cube, user_role, 'ChatGPT_Feelings', options)
         #st.markdown("<div class='css-card'>", unsafe_allow_html=True)
         fig_donut = plot_donut(st.session_state.responses['ChatGPT_Feelings'], options, my_counts)
         st.plotly_chart(fig_donut, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next)
         # ---------------------------
 
     # endregion
@@ -738,19 +1346,10 @@ with st.container():
             "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
             use_container_width=True)  #
 
-        st.markdown("#### Dans quelle mesure êtes-vous préoccupé.e.s par les IA ?")
-        ai_concern_scale = st.select_slider("", options=list(range(1, 11)), value=5)
-        # Custom labels below the slider
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col1:
-            st.write("**Les IA ne me causent aucun souci**")
-        with col3:
-            st.write("**Les IA me causent beaucoup d'inquiétude**")
-
-        if st.button("Continuer ➡️"):
-            st.session_state.responses['AI_Concern_Scale'] = ai_concern_scale
-            next_step()
-            st.rerun()
+        ask_question(12)
+
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[12][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -763,22 +1362,11 @@ with st.container():
             "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
             use_container_width=True)
 
-        st.markdown("#### Quels sont vos inquiétudes par rapport à l'IA ?")
-        ai_concern_items = st.multiselect("", ["Perte des capacités de réflexion critique", "Impact sur les générations futures", "Impact sur les industries artistiques et créatives", "Désinformation/mésinformation",
-                                         "Impact sur le marché du travail", "Impact sur l'environnement","Manque de confidentialité et de protection des données", "Je n'ai aucune inquiétude", "Autre"])
-
-        ai_other_text = ""
-        if "Autre" in ai_concern_items:
-            ai_other_text = st.text_input("Précisez pour 'Autre' :")
+        ask_question(13)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            final_purpose_list = [p for p in ai_concern_items if p != "Autre"]
-            if ai_other_text: final_purpose_list.append(ai_other_text)  # Just store text for wordcloud later
-
-            st.session_state.responses['AI_Concern_Items'] = ", ".join(final_purpose_list)
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[13][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -791,28 +1379,11 @@ with st.container():
             "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
             use_container_width=True)
 
-        st.markdown("#### Selon vous, qui est le plus responsable de l'enseignement des compétences dans les IA ?")
-        ai_responsible_people = st.multiselect("", ["Moi-même",
-                                               "Mes proches (amis, frères, soeurs)",
-                                               "L'école (ienseignants, bibliothécaires)",
-                                               "L'IA elle-même",
-                                               "Les grandes entreprise de la Tech (Tech companies)",
-                                               "Les parents / éducateurs",
-                                               "Des experts (chercheurs)",
-                                               "Le gouvernement", "Autre"])
-
-        ai_other_text = ""
-        if "Autre" in ai_responsible_people:
-            ai_other_text = st.text_input("Précisez pour 'Autre' :")
+        ask_question(14)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            final_purpose_list = [p for p in ai_responsible_people if p != "Autre"]
-            if ai_other_text: final_purpose_list.append(ai_other_text)  # Just store text for wordcloud later
-
-            st.session_state.responses['AI_Responsible_People'] = ", ".join(final_purpose_list)
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[14][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -824,15 +1395,11 @@ with st.container():
         st.image(
             "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
             use_container_width=True)
-        st.markdown("#### Quelle fonctionnalité aimeriez-vous implémenter dans l'IA ?")
-        ai_feature = st.text_input("Ecrivez toutes vos idées", key = "ai_feature")
-
+        ask_question(15)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            st.session_state.responses['AI_Feature'] = ai_feature
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[15][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -844,26 +1411,11 @@ with st.container():
         st.image(
             "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
             use_container_width=True)
-        st.markdown("#### Les campagnes de prévention sont trop sérieuses, parmi les éléments suivants, lesquels t’aideraient à mieux comprendre les informations sur la bonne utilisation et la sécurité des IA?")
-        ai_prevention_campaign = st.multiselect("", ["Des explications plus simples et claires",
-                                                    "Des vidéos courtes ou des tutoriels",
-                                                    "Des influenceurs/ambassadeurs qui en parlent",
-                                                    "Des ateliers ou démonstrations en classe",
-                                                    "Des illustrations (publicités nationales radio/tv/réseaux sociaux)",
-                                                    "Autre"])
-
-        ai_other_text = ""
-        if "Autre" in ai_prevention_campaign:
-            ai_other_text = st.text_input("Précisez pour 'Autre' :", key="ai_other_text")
+        ask_question(16)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            final_purpose_list = [p for p in ai_prevention_campaign if p != "Autre"]
-            if ai_other_text: final_purpose_list.append(ai_other_text)  # Just store text for wordcloud later
-
-            st.session_state.responses['AI_Prevention_Campaign'] = ", ".join(final_purpose_list)
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[16][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -875,15 +1427,11 @@ with st.container():
         st.image(
             "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
             use_container_width=True)
-        st.markdown("#### Laissez-nous vos remarques et commentaires :")
-        ai_comments = st.text_input("")
-
+        ask_question(17)
         st.markdown("</div>", unsafe_allow_html=True)
 
-        if st.button("Continuer ➡️"):
-            st.session_state.responses['AI_Comments'] = ai_comments
-            next_step()
-            st.rerun()
+        st.button("Continuer ➡️", on_click=go_next, args=(QUESTIONS[17][2], OTHER_MISSING_WARNING))
+        show_nav_message()
     # endregion
 
     # ==========================
@@ -897,28 +1445,13 @@ with st.container():
             st.session_state.data_submitted = False
 
         if not st.session_state.data_submitted:
-            if st.button("Envoyer mes réponses"):
-                with st.spinner("Envoi en cours..."):
-                    #success = save_to_google_sheets(st.session_state.responses)
-
-                    # Add timestamp
-                    st.session_state.responses['Timestamp'] = datetime.now().isoformat()
-                    success = save_data_securely(st.session_state.responses, SHEET_ID, WORKSHEET_NAME, client)
-                    if success:
-                        st.session_state.data_submitted = True
-                        st.rerun()
-                    else:
-                        st.error("Erreur de sauvegarde.")
+            #success = save_to_google_sheets(st.session_state.responses)
+            st.button("Envoyer mes réponses", on_click=submit_responses, args=(storage,))
+            show_nav_message()
         else:
             # Data has been submitted, show success message
             st.success("Merci ! Vos réponses ont été enregistrées.")
-            st.balloons()
-            next_step()
-            st.rerun()
-
-            if st.button("Accéder à mes réponses"):
-                next_step()
-                st.rerun()
+            st.button("Accéder à mes réponses", on_click=go_next)
 
     # ==========================
     # region STEP 19: Ad final
@@ -927,6 +1460,11 @@ with st.container():
         st.progress(100)
         st.title("Merci pour votre participation !")
 
+        # Responses were just saved (step 18): celebrate once
+        if st.session_state.pop('show_balloons', False):
+            st.success("Merci ! Vos réponses ont été enregistrées.")
+            st.balloons()
+
 
         # --- Texte Streamlit ---
         st.markdown("""
@@ -952,9 +1490,7 @@ with st.container():
 
        # See results
         #if st.button("Terminer"):
-        if st.button("Voir les résultats"):
-            next_step()
-            st.rerun()
+        st.button("Voir les résultats", on_click=go_next)
 
     # ==========================
     # region STEP 20: See results
@@ -965,11 +1501,26 @@ with st.container():
         st.markdown("Cette page est en cours de construction.")
 
         # region Charger les données et afficher les noms des colonnes
-        @st.cache_data(ttl=60)
         def load_data_to_see_results():
             #SHEET_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRCbQDPet7-hUdVO0-CzfC3KrhHY6JbUO4UlMpUwbJJ_cp2LhqJSnX34jD-xqZcFAmI4FZZcEg9Wsuj/pub?output=csv"
             SHEET_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vSPTS9isgo2apuzJ0KIZlAaPFeuo4tKQX2ocfvo6iIeBPifyOACKlyzGb4tePNflmNDr8jgtze4wia1/pub?gid=0&single=true&output=csv"
-            df = pd.read_csv(SHEET_URL)
+            if STORAGE_BACKEND != "sheets":
+                # Read from the local store (or replica): no published CSV to download
+                return load_data(storage, RESULTS_COLUMNS)
+
+            def parse(body):
+                # Only the columns this page reads are parsed
+                return freeze_frame(apply_response_schema(pd.read_csv(body, usecols=lambda column: column in RESULTS_COLUMNS)))
+
+            # Resolved here, in the script thread, because the fetch may run in a background refresh
+            csv_fetcher = get_csv_fetcher()
+            # Served from the stale-while-revalidate cache; concurrent misses share one download,
+            # and a refresh only downloads and parses the CSV again if the sheet changed
+            df = get_data_cache().get(
+                ("load_data_to_see_results", SHEET_URL),
+                lambda: csv_fetcher.fetch(SHEET_URL, parse),
+                RESULTS_SOFT_TTL_SECONDS, RESULTS_HARD_TTL_SECONDS
+            )
             # Convertir la colonne Timestamp en datetime
             #df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%m/%d/%Y %H:%M:%S')
 
@@ -988,12 +1539,12 @@ with st.container():
 
         # region Utils Functions
 
-        # Simplifier les labels pour l'affichage
-        def simplify_category(category):
+        # Groupes des comparaisons adolescents / adultes (nuages de mots, donuts)
+        def simplify_group(category):
             if pd.isna(category):
                 return "Non spécifié"
             elif "ado" in category.lower():
-                return "Adolescents (11-17 ans)"
+                return "Adolescents"
             elif "adulte" in category.lower():
                 return "Adultes"
             else:
@@ -1001,387 +1552,23 @@ with st.container():
         # endregion
 
         # region Graph Functions
-        # Fonction pour créer un graphique Likert
-        def create_likert_chart(data, question_col, title, participant_answer=None):
-            """
-            Crée un graphique Likert horizontal
-            """
-            # Compter les réponses
-            counts = data[question_col].value_counts()
-
-            # Calculer les pourcentages
-            percentages = (counts / len(data)) * 100
-
-            # Créer le graphique
-            fig, ax = plt.subplots(figsize=(12, 6))
-
-            # Définir les couleurs pour l'échelle Likert (du négatif au positif)
-            colors = ['#d32f2f', '#f57c00', '#fbc02d', '#388e3c']  # Rouge, Orange, Jaune, Vert
-
-            # Créer les barres horizontales
-            bars = ax.barh(range(len(counts)), percentages.values,
-                           color=colors[:len(counts)], alpha=0.7, edgecolor='black', linewidth=1)
-
-            # Mettre en évidence la réponse du participant si elle existe
-            if participant_answer is not None and participant_answer in counts.index:
-                participant_idx = list(counts.index).index(participant_answer)
-                bars[participant_idx].set_edgecolor('red')
-                bars[participant_idx].set_linewidth(3)
-                bars[participant_idx].set_alpha(1.0)
-
-            # Personnaliser le graphique
-            ax.set_yticks(range(len(counts)))
-            ax.set_yticklabels(counts.index, fontsize=11)
-            ax.set_xlabel('Pourcentage des réponses (%)', fontsize=12, fontweight='bold')
-            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-
-            # Ajouter les valeurs sur les barres
-            for i, (bar, count, pct) in enumerate(zip(bars, counts.values, percentages.values)):
-                ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
-                        f'{count} ({pct:.1f}%)',
-                        ha='left', va='center', fontweight='bold', fontsize=10)
-
-            # Améliorer l'apparence
-            ax.set_xlim(0, max(percentages.values) * 1.2)
-            ax.grid(axis='x', alpha=0.3, linestyle='--')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-
-            plt.tight_layout()
-            return fig
-
-
-        # Fonction pour créer un graphique d'échelle numérique
-        def create_numeric_scale_chart(data, question_col, title, participant_answer=None):
-            """
-            Crée un graphique en barres pour une échelle numérique (1-10)
-            """
-            # Compter les réponses
-            counts = data[question_col].value_counts().sort_index()
-
-            # S'assurer que toutes les valeurs de 1 à 10 sont présentes
-            all_values = pd.Series(0, index=range(1, 11))
-            for value, count in counts.items():
-                if 1 <= value <= 10:
-                    all_values[value] = count
-
-            # Calculer les pourcentages
-            percentages = (all_values / len(data)) * 100
-
-            fig, ax = plt.subplots(figsize=(14, 8))
-
-            # Définir un gradient de couleurs du vert (peu préoccupé) au rouge (très préoccupé)
-            colors = plt.cm.RdYlGn_r(np.linspace(0.2, 0.8, 10))
-
-            # Créer les barres
-            bars = ax.bar(range(1, 11), percentages.values, color=colors, alpha=0.7,
-                          edgecolor='black', linewidth=1)
-
-            # Mettre en évidence la réponse du participant
-            if participant_answer is not None and 1 <= participant_answer <= 10:
-                bars[int(participant_answer) - 1].set_edgecolor('red')
-                bars[int(participant_answer) - 1].set_linewidth(4)
-                bars[int(participant_answer) - 1].set_alpha(1.0)
-
-            # Personnaliser le graphique
-            ax.set_xlabel('Niveau de préoccupation (1 = Pas du tout, 10 = Extrêmement)',
-                          fontsize=12, fontweight='bold')
-            ax.set_ylabel('Pourcentage des réponses (%)', fontsize=12, fontweight='bold')
-            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-            ax.set_xticks(range(1, 11))
-
-            # Ajouter les valeurs sur les barres
-            for i, (bar, count, pct) in enumerate(zip(bars, all_values.values, percentages.values)):
-                if count > 0:  # N'afficher que si il y a des réponses
-                    ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
-                            f'{count}\n({pct:.1f}%)',
-                            ha='center', va='bottom', fontweight='bold', fontsize=9)
-
-            # Améliorer l'apparence
-            ax.set_ylim(0, max(percentages.values) * 1.2 if max(percentages.values) > 0 else 10)
-            ax.grid(axis='y', alpha=0.3, linestyle='--')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-
-            plt.tight_layout()
-            return fig
-
-
-        # Fonction pour créer un graphique de comparaison par catégorie d'âge
-        def create_age_category_comparison_chart(data, question_col, category_col, title):
-            """
-            Crée un graphique comparant les réponses entre adolescents et adultes
-            """
-            # Filtrer les données valides (réponses de 1 à 10)
-            valid_data = data[
-                (data[question_col].between(1, 10)) &
-                (data[category_col].notna())
-                ].copy()
-
-            if len(valid_data) == 0:
-                return None
-
-            valid_data['Groupe_Simple'] = valid_data[category_col].apply(simplify_category)
-
-            # Calculer les moyennes par groupe
-            avg_by_group = valid_data.groupby('Groupe_Simple')[question_col].agg(['mean', 'count', 'std']).round(2)
-
-            # fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-            fig, ax1 = plt.subplots(1, 1, figsize=(16, 10))
-
-            # Graphique 1: Moyennes par groupe avec barres d'erreur
-            colors = ['#ff7f50', '#4682b4']  # Orange pour ados, Bleu pour adultes
-            bars1 = ax1.bar(avg_by_group.index, avg_by_group['mean'],
-                            color=colors[:len(avg_by_group)], alpha=0.7,
-                            edgecolor='black', linewidth=1,
-                            yerr=avg_by_group['std'], capsize=5)
-
-            ax1.set_ylabel('Niveau moyen de préoccupation', fontsize=11, fontweight='bold')
-            ax1.set_title('Niveau moyen de préoccupation par groupe', fontsize=12, fontweight='bold')
-            ax1.set_ylim(0, 10)
-            ax1.grid(axis='y', alpha=0.3, linestyle='--')
-
-            # Rotation des labels si nécessaire
-            ax1.tick_params(axis='x', rotation=45)
-
-            # Ajouter les valeurs sur les barres
-            for i, (bar, (idx, row)) in enumerate(zip(bars1, avg_by_group.iterrows())):
-                ax1.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.2,
-                         f'{row["mean"]:.1f}\n(n={int(row["count"])})',
-                         ha='center', va='bottom', fontweight='bold', fontsize=10)
-
-            # Graphique 2: Distribution détaillée
-            # groups = valid_data['Groupe_Simple'].unique()
-            # if len(groups) >= 2:
-            #     data_by_group = [valid_data[valid_data['Groupe_Simple'] == group][question_col]
-            #                      for group in sorted(groups)]
-            #
-            #     bins = np.arange(0.5, 11.5, 1)
-            #     ax2.hist(data_by_group, bins=bins, alpha=0.7,
-            #              label=sorted(groups), color=colors[:len(groups)],
-            #              edgecolor='black')
-            #     ax2.set_xlabel('Niveau de préoccupation', fontsize=11, fontweight='bold')
-            #     ax2.set_ylabel('Nombre de réponses', fontsize=11, fontweight='bold')
-            #     ax2.set_title('Distribution des réponses par groupe', fontsize=12, fontweight='bold')
-            #     ax2.set_xticks(range(1, 11))
-            #     ax2.legend()
-            #     ax2.grid(axis='y', alpha=0.3, linestyle='--')
-
-            plt.tight_layout()
-            return fig
-
-
-        # Fonction pour créer comparaison de wordcloud graphique
-        def create_wordcloud_comparison(data, text_col, category_col):
-            """
-            Crée des word clouds comparatifs pour adolescents et adultes
-            """
-
-            # Préparer les données
-            valid_data = data[(data[text_col].notna()) & (data[category_col].notna())].copy()
-            valid_data['Groupe_Simple'] = valid_data[category_col].apply(simplify_category)
-
-            # Séparer les réponses par groupe
-            adolescents_text = valid_data[valid_data['Groupe_Simple'] == 'Adolescents'][text_col]
-            adultes_text = valid_data[valid_data['Groupe_Simple'] == 'Adultes'][text_col]
-
-            if len(adolescents_text) == 0 and len(adultes_text) == 0:
-                return None, None
-
-            # Nettoyer et combiner le texte pour chaque groupe
-            def clean_and_combine_text(text_series):
-                if len(text_series) == 0:
-                    return ""
-
-                # Combiner tous les textes
-                combined_text = ' '.join(text_series.astype(str))
-
-                # Nettoyer le texte (optionnel - vous pouvez ajuster selon vos besoins)
-                combined_text = re.sub(r'[^\w\s]', ' ', combined_text)  # Supprimer la ponctuation
-                combined_text = re.sub(r'\s+', ' ', combined_text)  # Normaliser les espaces
-
-                return combined_text.lower()
-
-            adolescents_combined = clean_and_combine_text(adolescents_text)
-            adultes_combined = clean_and_combine_text(adultes_text)
-
-            # Créer les word clouds
-            wordcloud_kwargs = {
-                'width': 800,
-                'height': 400,
-                'background_color': 'white',
-                'max_words': 100,
-                'relative_scaling': 0.5,
-                'min_font_size': 10
-            }
-
-            wc_adolescents = None
-            wc_adultes = None
-
-            if adolescents_combined.strip():
-                wc_adolescents = WordCloud(**wordcloud_kwargs, colormap='Oranges').generate(adolescents_combined)
-
-            if adultes_combined.strip():
-                wc_adultes = WordCloud(**wordcloud_kwargs, colormap='Blues').generate(adultes_combined)
-
-            return wc_adolescents, wc_adultes
-
-
-        def plot_wordclouds(wc_adolescents, wc_adultes, adolescents_count, adultes_count):
-            """
-            Affiche les word clouds côte à côte
-            """
-            # Déterminer le nombre de subplots nécessaires
-            valid_clouds = sum([wc_adolescents is not None, wc_adultes is not None])
-
-            if valid_clouds == 0:
-                st.warning("Aucun word cloud ne peut être généré - données textuelles insuffisantes")
-                return None
-
-            if valid_clouds == 1:
-                fig, ax = plt.subplots(1, 1, figsize=(12, 6))
-                axes = [ax]
-            else:
-                fig, axes = plt.subplots(1, 2, figsize=(16, 8))
-
-            current_ax = 0
-
-            # Word cloud des adolescents
-            if wc_adolescents is not None:
-                axes[current_ax].imshow(wc_adolescents, interpolation='bilinear')
-                axes[current_ax].set_title(f'🧑‍🎓 Adolescents (n={adolescents_count})',
-                                           fontsize=14, fontweight='bold', color='#ff7f50')
-                axes[current_ax].axis('off')
-                current_ax += 1
-
-            # Word cloud des adultes
-            if wc_adultes is not None:
-                ax_index = current_ax if valid_clouds == 2 else 0
-                axes[ax_index].imshow(wc_adultes, interpolation='bilinear')
-                axes[ax_index].set_title(f'👨‍👩‍👧‍👦 Adultes (n={adultes_count})',
-                                         fontsize=14, fontweight='bold', color='#4682b4')
-                axes[ax_index].axis('off')
-
-            plt.tight_layout()
-            return fig
-
-
         def create_donut_comparison(data, question_col, category_col):
             """
             Crée des graphiques en donut comparatifs pour adolescents et adultes
             """
 
-            # Préparer les données
-            valid_data = data[(data[question_col].notna()) & (data[category_col].notna())].copy()
-            valid_data['Groupe_Simple'] = valid_data[category_col].apply(simplify_category)
-
-            # Séparer les données par groupe
-            adolescents_data = valid_data[valid_data['Groupe_Simple'] == 'Adolescents'][question_col]
-            adultes_data = valid_data[valid_data['Groupe_Simple'] == 'Adultes'][question_col]
+            # Groupe de chaque ligne (les lignes sans catégorie ne sont pas comptées)
+            groups = data[category_col].dropna().apply(simplify_group)
 
-            # Cette colonne peut contenir plusieurs réponses séparées par des virgules
-            # On va les séparer et compter chaque élément
-            def process_multiple_answers(data_series):
-                if len(data_series) == 0:
-                    return {}
+            # Cette colonne peut contenir plusieurs réponses séparées par des virgules :
+            # elles sont découpées une seule fois par version des données (index long)
+            long_form = get_multi_select_index("results").get(data)
+            counts = count_multi_select(long_form, question_col, groups)
 
-                all_answers = []
-                for response in data_series:
-                    if pd.notna(response):
-                        # Séparer les réponses multiples (supposant qu'elles sont séparées par des virgules)
-                        answers = [answer.strip() for answer in str(response).split(',')]
-                        all_answers.extend(answers)
-                # Compter les occurrences
-                return Counter(all_answers)
-
-            adolescents_counts = process_multiple_answers(adolescents_data)
-            adultes_counts = process_multiple_answers(adultes_data)
+            adolescents_counts = counts.get('Adolescents', Counter())
+            adultes_counts = counts.get('Adultes', Counter())
 
             return adolescents_counts, adultes_counts
-
-
-        def plot_donut_charts(adolescents_counts, adultes_counts):
-            """
-            Affiche les graphiques en donut côte à côte
-            """
-            # Vérifier s'il y a des données
-            if not adolescents_counts and not adultes_counts:
-                st.warning("Aucune donnée disponible pour créer les graphiques")
-                return None
-
-            # Déterminer le nombre de graphiques à afficher
-            charts_to_show = []
-            if adolescents_counts:
-                charts_to_show.append(('Adolescents', adolescents_counts, '#ff7f50'))
-            if adultes_counts:
-                charts_to_show.append(('Adultes', adultes_counts, '#4682b4'))
-
-            if len(charts_to_show) == 0:
-                return None
-
-            # Créer la figure
-            if len(charts_to_show) == 1:
-                fig, ax = plt.subplots(1, 1, figsize=(10, 8))
-                axes = [ax]
-            else:
-                fig, axes = plt.subplots(1, 2, figsize=(16, 8))
-
-            for i, (group_name, counts, base_color) in enumerate(charts_to_show):
-                ax = axes[i] if len(charts_to_show) > 1 else axes[0]
-
-                # Préparer les données pour le graphique
-                labels = list(counts.keys())
-                sizes = list(counts.values())
-                total_responses = sum(sizes)
-
-                # Tronquer les labels trop longs pour l'affichage
-                display_labels = []
-                for label in labels:
-                    if len(label) > 30:
-                        display_labels.append(label[:27] + "...")
-                    else:
-                        display_labels.append(label)
-
-                # Créer une palette de couleurs basée sur la couleur de base
-                if base_color == '#ff7f50':  # Orange pour adolescents
-                    colors = plt.cm.Oranges(np.linspace(0.4, 0.8, len(sizes)))
-                else:  # Bleu pour adultes
-                    colors = plt.cm.Blues(np.linspace(0.4, 0.8, len(sizes)))
-
-                # Créer le donut chart
-                wedges, texts, autotexts = ax.pie(
-                    sizes,
-                    labels=display_labels,
-                    colors=colors,
-                    autopct=lambda pct: f'{pct:.1f}%\n({int(pct / 100 * total_responses)})',
-                    startangle=90,
-                    pctdistance=0.85,
-                    wedgeprops=dict(width=0.5, edgecolor='white', linewidth=2)
-                )
-
-                # Personnaliser le texte
-                for autotext in autotexts:
-                    autotext.set_color('black')
-                    autotext.set_fontweight('bold')
-                    autotext.set_fontsize(9)
-
-                for text in texts:
-                    text.set_fontsize(10)
-                    text.set_fontweight('bold')
-
-                # Ajouter le titre avec emoji approprié
-                emoji = "🧑‍🎓" if group_name == "Adolescents" else "👨‍👩‍👧‍👦"
-                ax.set_title(f'{emoji} {group_name}\n({total_responses} réponses)',
-                             fontsize=14, fontweight='bold', pad=20)
-
-                # Ajouter le texte au centre du donut
-                ax.text(0, 0, f'{total_responses}\nréponses',
-                        horizontalalignment='center', verticalalignment='center',
-                        fontsize=12, fontweight='bold',
-                        bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
-
-            plt.tight_layout()
-            return fig
         # endregion
 
         # region Section pour le code secret
@@ -1393,9 +1580,10 @@ with st.container():
         valid_code = False
 
         if secret_code:
-            if secret_code in df["Secret_Code"].values:
+            # Indexed lookup in the results frame the charts below are drawn from
+            participant_data = find_participant(df, secret_code, "results")
+            if participant_data is not None:
                 st.success("Code secret valide! Tu peux voir tes résultats.")
-                participant_data = df[df["Secret_Code"] == secret_code].iloc[0]
                 valid_code = True
             else:
                 st.error("Code secret invalide. Vérifie ton code et réessaye.")
@@ -1410,6 +1598,7 @@ with st.container():
         if screen_habit_column in df.columns:
             # Afficher les statistiques
             screen_counts = df[screen_habit_column].value_counts()
+            screen_counts = screen_counts[screen_counts > 0]
 
             st.write("**Répartition des réponses :**")
             for answer, count in screen_counts.items():
@@ -1423,15 +1612,13 @@ with st.container():
                 st.info(f"🎯 **Ta réponse :** {participant_screen_habit}")
 
             # Créer et afficher le graphique Likert
-            fig = create_likert_chart(
-                df,
-                screen_habit_column,
+            show_chart(
+                'likert',
+                *count_likert_answers(df, screen_habit_column),
                 "Habitudes d'écrans avant le sommeil - Échelle de Likert",
                 participant_screen_habit
             )
 
-            st.pyplot(fig)
-
             # Ajouter une légende si un participant est mis en évidence
             if valid_code and participant_data is not None:
                 st.caption("🔴 **Barre avec bordure rouge** : Votre réponse")
@@ -1482,12 +1669,12 @@ with st.container():
                         st.write(f"**Interprétation :** {interpretation}")
 
                 # Créer le graphique principal
-                fig1 = create_numeric_scale_chart(
-                    df, ai_concern_column,
+                show_chart(
+                    'numeric_scale',
+                    *count_numeric_scale_answers(df, ai_concern_column),
                     "Distribution des niveaux de préoccupation concernant l'IA",
                     participant_ai_concern
                 )
-                st.pyplot(fig1)
 
                 # Ajouter la légende si un participant est mis en évidence
                 if valid_code and participant_data is not None and pd.notna(participant_ai_concern):
@@ -1497,10 +1684,9 @@ with st.container():
                 if age_category_column in df.columns:
                     st.subheader("📈 Comparaison Adolescents vs Adultes")
 
-                    fig2 = create_age_category_comparison_chart(df, ai_concern_column, age_category_column,
-                                                                "Comparaison des préoccupations IA : Ados vs Adultes")
-                    if fig2 is not None:
-                        st.pyplot(fig2)
+                    fig2 = show_chart('age_comparison', age_category_stats(df, ai_concern_column, age_category_column),
+                                      "Comparaison des préoccupations IA : Ados vs Adultes")
+                    if fig2:
 
                         # Analyse comparative détaillée
                         valid_comparison_data = df[
@@ -1513,6 +1699,7 @@ with st.container():
                             "Adultes" if pd.notna(x) and "adulte" in str(x).lower() else "Autre"
                         )
 
+                        valid_comparison_data[ai_concern_column] = valid_comparison_data[ai_concern_column].astype('float64')
                         comparison_stats = \
                             valid_comparison_data[
                                 valid_comparison_data['Groupe_Simple'].isin(['Adolescents', 'Adultes'])].groupby(
@@ -1585,20 +1772,9 @@ with st.container():
 
             if len(valid_responses) > 0:
                 # Compter les réponses par groupe
-                def simplify_category(category):
-                    if pd.isna(category):
-                        return "Non spécifié"
-                    elif "ado" in category.lower():
-                        return "Adolescents"
-                    elif "adulte" in category.lower():
-                        return "Adultes"
-                    else:
-                        return category
-
-
                 valid_responses_copy = valid_responses.copy()
                 valid_responses_copy['Groupe_Simple'] = valid_responses_copy[age_category_column].apply(
-                    simplify_category)
+                    simplify_group)
 
                 group_counts = valid_responses_copy['Groupe_Simple'].value_counts()
                 adolescents_count = group_counts.get('Adolescents', 0)
@@ -1615,13 +1791,18 @@ with st.container():
                 with col3:
                     st.metric("📝 Total", len(valid_responses))
 
-                # Créer les word clouds
-                wc_adolescents, wc_adultes = create_wordcloud_comparison(df, ai_features_column, age_category_column)
+                # Fréquences des mots par groupe, tenues à jour au fil des nouvelles réponses
+                word_store = get_word_frequencies("results")
+                word_store.sync(df)
+                adolescents_frequencies = word_store.frequencies('ado', WORDCLOUD_MAX_WORDS)
+                adultes_frequencies = word_store.frequencies('adulte', WORDCLOUD_MAX_WORDS)
 
-                # Afficher les word clouds
-                fig = plot_wordclouds(wc_adolescents, wc_adultes, adolescents_count, adultes_count)
-                if fig is not None:
-                    st.pyplot(fig)
+                # Créer et afficher les word clouds (générés par le service de rendu)
+                fig = show_chart('wordclouds', dict(adolescents_frequencies), dict(adultes_frequencies),
+                                 int(adolescents_count), int(adultes_count), group="Adolescents/Adultes")
+                if fig is None:
+                    st.warning("Aucun word cloud ne peut être généré - données textuelles insuffisantes")
+                if fig:
 
                     # Ajouter des explications
                     st.write("**💡 Comment lire ces nuages de mots :**")
@@ -1638,49 +1819,19 @@ with st.container():
                 # Optionnel: Afficher les réponses les plus fréquentes
                 st.subheader("🔤 Mots les plus fréquents")
 
-
-                # Analyser les mots les plus fréquents pour chaque groupe
-                def get_top_words(text_series, top_n=10):
-                    if len(text_series) == 0:
-                        return []
-
-                    # Combiner tout le texte
-                    all_text = ' '.join(text_series.astype(str).str.lower())
-
-                    # Extraire les mots (supprimer la ponctuation)
-                    words = re.findall(r'\b\w+\b', all_text)
-
-                    # Filtrer les mots trop courts ou communs
-                    stop_words = {'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'de', 'du', 'dans', 'avec', 'pour',
-                                  'sur',
-                                  'par', 'que', 'qui', 'ce', 'cette', 'ces', 'je', 'tu', 'il', 'elle', 'nous', 'vous',
-                                  'ils',
-                                  'elles', 'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'à', 'au', 'aux'}
-                    filtered_words = [word for word in words if len(word) > 2 and word not in stop_words]
-
-                    # Compter les occurrences
-                    word_counts = Counter(filtered_words)
-                    return word_counts.most_common(top_n)
-
-
-                adolescents_data = valid_responses_copy[valid_responses_copy['Groupe_Simple'] == 'Adolescents'][
-                    ai_features_column]
-                adultes_data = valid_responses_copy[valid_responses_copy['Groupe_Simple'] == 'Adultes'][
-                    ai_features_column]
-
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    if len(adolescents_data) > 0:
+                    if adolescents_count > 0:
                         st.write("**🧑‍🎓 Top mots - Adolescents :**")
-                        top_words_ados = get_top_words(adolescents_data, 8)
+                        top_words_ados = adolescents_frequencies.most_common(8)
                         for i, (word, count) in enumerate(top_words_ados, 1):
                             st.write(f"{i}. **{word}** ({count} fois)")
 
                 with col2:
-                    if len(adultes_data) > 0:
+                    if adultes_count > 0:
                         st.write("**👨‍👩‍👧‍👦 Top mots - Adultes :**")
-                        top_words_adultes = get_top_words(adultes_data, 8)
+                        top_words_adultes = adultes_frequencies.most_common(8)
                         for i, (word, count) in enumerate(top_words_adultes, 1):
                             st.write(f"{i}. **{word}** ({count} fois)")
 
@@ -1727,9 +1878,10 @@ with st.container():
                     st.metric("📝 Total", total_adolescents + total_adultes)
 
                 # Créer et afficher les graphiques
-                fig = plot_donut_charts(adolescents_counts, adultes_counts)
-                if fig is not None:
-                    st.pyplot(fig)
+                fig = show_chart('donuts', adolescents_counts, adultes_counts)
+                if fig is None:
+                    st.warning("Aucune donnée disponible pour créer les graphiques")
+                if fig:
 
                     # Ajouter la réponse du participant si disponible
                     if valid_code and participant_data is not None:
@@ -1821,7 +1973,4 @@ with st.container():
 
         # endregion
 
-        if st.button("Terminer"):
-            st.session_state.step = 1
-            st.session_state.responses = {}
-            st.rerun()
+        st.button("Terminer", on_click=restart_survey)
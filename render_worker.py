@@ -0,0 +1,165 @@
+# Processus de rendu des graphiques (micah_sleepscreenai_app.py, cite_des_metiers_app.py).
+# Chaque processus est lancé comme un script à part (python render_worker.py) : il n'importe que
+# results_charts, jamais l'application Streamlit. Il lit des demandes (nom du graphique, arguments
+# agrégés) sur stdin et renvoie (PNG, erreur) sur stdout, en pickles précédés de leur taille.
+# RenderService, côté serveur, répartit les demandes entre ces processus.
+
+# region imports
+import pickle
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from results_charts import render_chart
+# endregion
+
+# region Protocole
+HEADER = struct.Struct("!Q")
+
+
+def write_message(stream, message):
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def read_message(stream):
+    """Message suivant du flux, ou None si l'autre côté l'a fermé."""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    payload = stream.read(HEADER.unpack(header)[0])
+    return pickle.loads(payload)
+
+
+def main():
+    requests_in = sys.stdin.buffer
+    replies_out = sys.stdout.buffer
+    # Un print() d'une bibliothèque ne doit pas se mêler aux réponses
+    sys.stdout = sys.stderr
+    while True:
+        request = read_message(requests_in)
+        if request is None:
+            # Le serveur s'est arrêté (ou a fermé ce processus)
+            return
+        chart, args = request
+        try:
+            reply = (render_chart(chart, *args), None)
+        except Exception as e:
+            reply = (None, f"{type(e).__name__}: {e}")
+        write_message(replies_out, reply)
+# endregion
+
+# region Service
+class RenderWorker:
+    """Un processus de rendu, qui traite une demande à la fois."""
+
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, __file__], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def render(self, chart, args):
+        write_message(self.process.stdin, (chart, args))
+        reply = read_message(self.process.stdout)
+        if reply is None:
+            raise EOFError("render worker exited")
+        png, error = reply
+        if error is not None:
+            raise RuntimeError(error)
+        return png
+
+    def close(self):
+        self.process.kill()
+
+
+class RenderService:
+    """
+    Processus de rendu qui transforment un graphique (nom dans results_charts.CHARTS + données agrégées)
+    en PNG. Seules ces données passent d'un processus à l'autre : la figure est construite, encodée et
+    libérée dans le processus de rendu.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        # Une place par rendu en cours ou en attente ; libérée à la fin du rendu, même après un délai dépassé
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.idle = queue.Queue()
+        self.executor = None
+
+    def start(self):
+        with self.lock:
+            if self.executor is None and self.workers > 0:
+                # Un thread par processus : il envoie la demande et attend la réponse
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+                for _ in range(self.workers):
+                    self.idle.put(RenderWorker())
+            return self.executor
+
+    def _release(self, job, worker, dead):
+        """Remet le processus (un remplaçant s'il est mort ou tué) dans la file ; True si l'appelant attend."""
+        with self.lock:
+            job["worker"] = None
+            abandoned = job["abandoned"]
+        if dead or abandoned:
+            worker.close()
+            worker = RenderWorker()
+        self.idle.put(worker)
+        return not abandoned
+
+    def _render_in_worker(self, job, chart, args):
+        worker = self.idle.get()
+        with self.lock:
+            if job["abandoned"]:
+                self.idle.put(worker)
+                return None
+            # render() doit savoir quel processus tuer si le délai est dépassé
+            job["worker"] = worker
+        try:
+            png = worker.render(chart, args)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Le processus est mort (ou a été tué après un délai dépassé) : on le remplace,
+            # et on dessine celui-ci ici seulement si l'appelant l'attend encore
+            if self._release(job, worker, dead=True):
+                return render_chart(chart, *args)
+            return None
+        except Exception:
+            self._release(job, worker, dead=False)
+            raise
+        self._release(job, worker, dead=False)
+        return png
+
+    def render(self, chart, *args):
+        """PNG du graphique, ou None s'il n'a rien à afficher. Lève TimeoutError."""
+        if self.workers == 0:
+            return render_chart(chart, *args)
+
+        deadline = time.monotonic() + self.timeout
+        if not self.slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"render queue full ({chart})")
+
+        job = {"worker": None, "abandoned": False}
+        future = self.start().submit(self._render_in_worker, job, chart, args)
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            with self.lock:
+                job["abandoned"] = True
+                worker = job["worker"]
+            # Pas encore pris : retiré de la file. Déjà pris : on tue le processus, son thread le remplace
+            # et libère la place, au lieu de garder un rendu que plus personne n'attend
+            future.cancel()
+            if worker is not None:
+                worker.close()
+            raise TimeoutError(f"render timed out ({chart})")
+# endregion
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+# Graphiques des pages de résultats (micah_sleepscreenai_app.py étape 20, cite_des_metiers_app.py).
+# Les figures sont des matplotlib.figure.Figure sur un canevas Agg, sans l'état global de pyplot :
+# plusieurs sessions peuvent les construire en parallèle, et figure_to_png() les libère après l'encodage.
+# render_chart() est le point d'entrée des processus de rendu (render_worker.py) : il reçoit le nom du
+# graphique et ses données agrégées (comptes, fréquences des mots), et renvoie le PNG.
+
+# region imports
+import io
+
+import numpy as np
+import pandas as pd
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+# endregion
+
+# region Utils Functions
+def new_figure(nrows=1, ncols=1, figsize=None):
+    """Comme plt.subplots, mais la figure n'est pas enregistrée dans pyplot."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols)
+
+
+def figure_to_png(fig, dpi=200):
+    """Encode la figure en PNG comme st.pyplot (200 dpi, cadre ajusté), puis la vide."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+# Simplifier les labels pour l'affichage
+def simplify_category(category):
+    if pd.isna(category):
+        return "Non spécifié"
+    elif "ado" in category.lower():
+        return "Adolescents (11-17 ans)"
+    elif "adulte" in category.lower():
+        return "Adultes"
+    else:
+        return category
+# endregion
+
+# region Aggregation Functions
+# Calculées dans le thread du script : seuls ces résultats (quelques nombres) sont envoyés aux processus de rendu
+def count_likert_answers(data, question_col):
+    """
+    Réponses du graphique Likert : [(réponse, nombre), ...] par fréquence décroissante, et le nombre de lignes
+    """
+    # Une colonne catégorielle liste aussi les options sans réponse
+    counts = data[question_col].value_counts()
+    counts = counts[counts > 0]
+    return [(answer, int(count)) for answer, count in counts.items()], len(data)
+
+
+def count_numeric_scale_answers(data, question_col):
+    """
+    Nombre de réponses pour chaque valeur de 1 à 10, et le nombre de lignes
+    """
+    counts = data[question_col].value_counts().sort_index()
+
+    # S'assurer que toutes les valeurs de 1 à 10 sont présentes
+    all_values = [0] * 10
+    for value, count in counts.items():
+        if 1 <= value <= 10 and float(value).is_integer():
+            all_values[int(value) - 1] = int(count)
+    return all_values, len(data)
+
+
+def age_category_stats(data, question_col, category_col):
+    """
+    Moyenne, nombre et écart-type des réponses (1 à 10) par groupe d'âge : [(groupe, moyenne, nombre, écart-type), ...]
+    None s'il n'y a aucune réponse valide
+    """
+    # Filtrer les données valides (réponses de 1 à 10)
+    valid_data = data[
+        (data[question_col].between(1, 10)) &
+        (data[category_col].notna())
+        ].copy()
+
+    if len(valid_data) == 0:
+        return None
+
+    valid_data['Groupe_Simple'] = valid_data[category_col].apply(simplify_category)
+
+    # Calculer les moyennes par groupe (en float : l'écart-type d'un seul point vaut NaN)
+    valid_data[question_col] = valid_data[question_col].astype('float64')
+    avg_by_group = valid_data.groupby('Groupe_Simple')[question_col].agg(['mean', 'count', 'std']).round(2)
+    return [(group, float(row['mean']), int(row['count']), float(row['std'])) for group, row in avg_by_group.iterrows()]
+# endregion
+
+# region Graph Functions
+# Fonction pour créer un graphique Likert
+def plot_likert_chart(counts, total, title, participant_answer=None):
+    """
+    Crée un graphique Likert horizontal à partir de count_likert_answers()
+    """
+    labels = [answer for answer, _ in counts]
+    values = np.array([count for _, count in counts])
+
+    # Calculer les pourcentages
+    percentages = (values / total) * 100
+
+    # Créer le graphique
+    fig, ax = new_figure(figsize=(12, 6))
+
+    # Définir les couleurs pour l'échelle Likert (du négatif au positif)
+    colors = ['#d32f2f', '#f57c00', '#fbc02d', '#388e3c']  # Rouge, Orange, Jaune, Vert
+
+    # Créer les barres horizontales
+    bars = ax.barh(range(len(counts)), percentages,
+                   color=colors[:len(counts)], alpha=0.7, edgecolor='black', linewidth=1)
+
+    # Mettre en évidence la réponse du participant si elle existe
+    if participant_answer is not None and participant_answer in labels:
+        participant_idx = labels.index(participant_answer)
+        bars[participant_idx].set_edgecolor('red')
+        bars[participant_idx].set_linewidth(3)
+        bars[participant_idx].set_alpha(1.0)
+
+    # Personnaliser le graphique
+    ax.set_yticks(range(len(counts)))
+    ax.set_yticklabels(labels, fontsize=11)
+    ax.set_xlabel('Pourcentage des réponses (%)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+
+    # Ajouter les valeurs sur les barres
+    for i, (bar, count, pct) in enumerate(zip(bars, values, percentages)):
+        ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
+                f'{count} ({pct:.1f}%)',
+                ha='left', va='center', fontweight='bold', fontsize=10)
+
+    # Améliorer l'apparence
+    ax.set_xlim(0, max(percentages) * 1.2)
+    ax.grid(axis='x', alpha=0.3, linestyle='--')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    fig.tight_layout()
+    return fig
+
+
+# Fonction pour créer un graphique d'échelle numérique
+def plot_numeric_scale_chart(counts, total, title, participant_answer=None):
+    """
+    Crée un graphique en barres pour une échelle numérique (1-10) à partir de count_numeric_scale_answers()
+    """
+    all_values = np.array(counts)
+
+    # Calculer les pourcentages
+    percentages = (all_values / total) * 100
+
+    fig, ax = new_figure(figsize=(14, 8))
+
+    # Définir un gradient de couleurs du vert (peu préoccupé) au rouge (très préoccupé)
+    colors = colormaps['RdYlGn_r'](np.linspace(0.2, 0.8, 10))
+
+    # Créer les barres
+    bars = ax.bar(range(1, 11), percentages, color=colors, alpha=0.7,
+                  edgecolor='black', linewidth=1)
+
+    # Mettre en évidence la réponse du participant
+    if participant_answer is not None and pd.notna(participant_answer) and 1 <= participant_answer <= 10:
+        bars[int(participant_answer) - 1].set_edgecolor('red')
+        bars[int(participant_answer) - 1].set_linewidth(4)
+        bars[int(participant_answer) - 1].set_alpha(1.0)
+
+    # Personnaliser le graphique
+    ax.set_xlabel('Niveau de préoccupation (1 = Pas du tout, 10 = Extrêmement)',
+                  fontsize=12, fontweight='bold')
+    ax.set_ylabel('Pourcentage des réponses (%)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.set_xticks(range(1, 11))
+
+    # Ajouter les valeurs sur les barres
+    for i, (bar, count, pct) in enumerate(zip(bars, all_values, percentages)):
+        if count > 0:  # N'afficher que si il y a des réponses
+            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
+                    f'{count}\n({pct:.1f}%)',
+                    ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    # Améliorer l'apparence
+    ax.set_ylim(0, max(percentages) * 1.2 if max(percentages) > 0 else 10)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    fig.tight_layout()
+    return fig
+
+
+# Fonction pour créer un graphique de comparaison par catégorie d'âge
+def plot_age_category_comparison_chart(stats, title):
+    """
+    Crée un graphique comparant les réponses entre adolescents et adultes, à partir de age_category_stats()
+    """
+    if not stats:
+        return None
+
+    groups = [group for group, _, _, _ in stats]
+    means = [mean for _, mean, _, _ in stats]
+    stds = [std for _, _, _, std in stats]
+
+    # fig, (ax1, ax2) = new_figure(1, 2, figsize=(16, 6))
+    fig, ax1 = new_figure(1, 1, figsize=(16, 10))
+
+    # Graphique 1: Moyennes par groupe avec barres d'erreur
+    colors = ['#ff7f50', '#4682b4']  # Orange pour ados, Bleu pour adultes
+    bars1 = ax1.bar(groups, means,
+                    color=colors[:len(stats)], alpha=0.7,
+                    edgecolor='black', linewidth=1,
+                    yerr=stds, capsize=5)
+
+    ax1.set_ylabel('Niveau moyen de préoccupation', fontsize=11, fontweight='bold')
+    ax1.set_title('Niveau moyen de préoccupation par groupe', fontsize=12, fontweight='bold')
+    ax1.set_ylim(0, 10)
+    ax1.grid(axis='y', alpha=0.3, linestyle='--')
+
+    # Rotation des labels si nécessaire
+    ax1.tick_params(axis='x', rotation=45)
+
+    # Ajouter les valeurs sur les barres
+    for i, (bar, (group, mean, count, std)) in enumerate(zip(bars1, stats)):
+        ax1.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.2,
+                 f'{mean:.1f}\n(n={count})',
+                 ha='center', va='bottom', fontweight='bold', fontsize=10)
+
+    # Graphique 2: Distribution détaillée
+    # groups = valid_data['Groupe_Simple'].unique()
+    # if len(groups) >= 2:
+    #     data_by_group = [valid_data[valid_data['Groupe_Simple'] == group][question_col]
+    #                      for group in sorted(groups)]
+    #
+    #     bins = np.arange(0.5, 11.5, 1)
+    #     ax2.hist(data_by_group, bins=bins, alpha=0.7,
+    #              label=sorted(groups), color=colors[:len(groups)],
+    #              edgecolor='black')
+    #     ax2.set_xlabel('Niveau de préoccupation', fontsize=11, fontweight='bold')
+    #     ax2.set_ylabel('Nombre de réponses', fontsize=11, fontweight='bold')
+    #     ax2.set_title('Distribution des réponses par groupe', fontsize=12, fontweight='bold')
+    #     ax2.set_xticks(range(1, 11))
+    #     ax2.legend()
+    #     ax2.grid(axis='y', alpha=0.3, linestyle='--')
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_wordclouds(wc_adolescents, wc_adultes, adolescents_count, adultes_count):
+    """
+    Word clouds côte à côte (None si aucun nuage n'a pu être généré)
+    """
+    # Déterminer le nombre de subplots nécessaires
+    valid_clouds = sum([wc_adolescents is not None, wc_adultes is not None])
+
+    if valid_clouds == 0:
+        return None
+
+    if valid_clouds == 1:
+        fig, ax = new_figure(1, 1, figsize=(12, 6))
+        axes = [ax]
+    else:
+        fig, axes = new_figure(1, 2, figsize=(16, 8))
+
+    current_ax = 0
+
+    # Word cloud des adolescents
+    if wc_adolescents is not None:
+        axes[current_ax].imshow(wc_adolescents, interpolation='bilinear')
+        axes[current_ax].set_title(f'🧑‍🎓 Adolescents (n={adolescents_count})',
+                                   fontsize=14, fontweight='bold', color='#ff7f50')
+        axes[current_ax].axis('off')
+        current_ax += 1
+
+    # Word cloud des adultes
+    if wc_adultes is not None:
+        ax_index = current_ax if valid_clouds == 2 else 0
+        axes[ax_index].imshow(wc_adultes, interpolation='bilinear')
+        axes[ax_index].set_title(f'👨‍👩‍👧‍👦 Adultes (n={adultes_count})',
+                                 fontsize=14, fontweight='bold', color='#4682b4')
+        axes[ax_index].axis('off')
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_donut_charts(adolescents_counts, adultes_counts):
+    """
+    Graphiques en donut côte à côte (None s'il n'y a aucune réponse)
+    """
+    # Vérifier s'il y a des données
+    if not adolescents_counts and not adultes_counts:
+        return None
+
+    # Déterminer le nombre de graphiques à afficher
+    charts_to_show = []
+    if adolescents_counts:
+        charts_to_show.append(('Adolescents', adolescents_counts, '#ff7f50'))
+    if adultes_counts:
+        charts_to_show.append(('Adultes', adultes_counts, '#4682b4'))
+
+    if len(charts_to_show) == 0:
+        return None
+
+    # Créer la figure
+    if len(charts_to_show) == 1:
+        fig, ax = new_figure(1, 1, figsize=(10, 8))
+        axes = [ax]
+    else:
+        fig, axes = new_figure(1, 2, figsize=(16, 8))
+
+    for i, (group_name, counts, base_color) in enumerate(charts_to_show):
+        ax = axes[i] if len(charts_to_show) > 1 else axes[0]
+
+        # Préparer les données pour le graphique
+        labels = list(counts.keys())
+        sizes = list(counts.values())
+        total_responses = sum(sizes)
+
+        # Tronquer les labels trop longs pour l'affichage
+        display_labels = []
+        for label in labels:
+            if len(label) > 30:
+                display_labels.append(label[:27] + "...")
+            else:
+                display_labels.append(label)
+
+        # Créer une palette de couleurs basée sur la couleur de base
+        if base_color == '#ff7f50':  # Orange pour adolescents
+            colors = colormaps['Oranges'](np.linspace(0.4, 0.8, len(sizes)))
+        else:  # Bleu pour adultes
+            colors = colormaps['Blues'](np.linspace(0.4, 0.8, len(sizes)))
+
+        # Créer le donut chart
+        wedges, texts, autotexts = ax.pie(
+            sizes,
+            labels=display_labels,
+            colors=colors,
+            autopct=lambda pct: f'{pct:.1f}%\n({int(pct / 100 * total_responses)})',
+            startangle=90,
+            pctdistance=0.85,
+            wedgeprops=dict(width=0.5, edgecolor='white', linewidth=2)
+        )
+
+        # Personnaliser le texte
+        for autotext in autotexts:
+            autotext.set_color('black')
+            autotext.set_fontweight('bold')
+            autotext.set_fontsize(9)
+
+        for text in texts:
+            text.set_fontsize(10)
+            text.set_fontweight('bold')
+
+        # Ajouter le titre avec emoji approprié
+        emoji = "🧑‍🎓" if group_name == "Adolescents" else "👨‍👩‍👧‍👦"
+        ax.set_title(f'{emoji} {group_name}\n({total_responses} réponses)',
+                     fontsize=14, fontweight='bold', pad=20)
+
+        # Ajouter le texte au centre du donut
+        ax.text(0, 0, f'{total_responses}\nréponses',
+                horizontalalignment='center', verticalalignment='center',
+                fontsize=12, fontweight='bold',
+                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
+
+    fig.tight_layout()
+    return fig
+# endregion
+
+# region Render Functions
+# Paramètres des nuages de mots comparatifs de l'étape 20
+WORDCLOUD_OPTIONS = {
+    'width': 800,
+    'height': 400,
+    'background_color': 'white',
+    'max_words': 100,
+    'relative_scaling': 0.5,
+    'min_font_size': 10
+}
+
+
+def create_wordcloud_figure(frequencies, width=800, height=400, background_color='#1E1E1E', colormap='Blues'):
+    """
+    Nuage de mots seul, sur fond sombre (étape 6), à partir des fréquences {mot: nombre}
+    """
+    # Importé ici : seuls les processus de rendu génèrent les nuages
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=width, height=height, background_color=background_color,
+                          colormap=colormap).generate_from_frequencies(frequencies)
+    fig, ax = new_figure()
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis("off")
+    fig.patch.set_facecolor(background_color)
+    return fig
+
+
+def create_wordclouds_figure(adolescents_frequencies, adultes_frequencies, adolescents_count, adultes_count):
+    """
+    Génère les nuages des deux groupes à partir des fréquences de leurs mots, puis les place côte à côte
+    """
+    from wordcloud import WordCloud
+
+    wc_adolescents = None
+    wc_adultes = None
+
+    if adolescents_frequencies:
+        wc_adolescents = WordCloud(**WORDCLOUD_OPTIONS, colormap='Oranges').generate_from_frequencies(adolescents_frequencies)
+
+    if adultes_frequencies:
+        wc_adultes = WordCloud(**WORDCLOUD_OPTIONS, colormap='Blues').generate_from_frequencies(adultes_frequencies)
+
+    return plot_wordclouds(wc_adolescents, wc_adultes, adolescents_count, adultes_count)
+
+
+# Graphiques disponibles pour render_chart(), par nom
+CHARTS = {
+    'likert': plot_likert_chart,
+    'numeric_scale': plot_numeric_scale_chart,
+    'age_comparison': plot_age_category_comparison_chart,
+    'wordcloud': create_wordcloud_figure,
+    'wordclouds': create_wordclouds_figure,
+    'donuts': plot_donut_charts,
+}
+
+
+def render_chart(chart, *args):
+    """
+    Construit le graphique `chart` et renvoie son PNG (None si le graphique n'a rien à afficher)
+    """
+    fig = CHARTS[chart](*args)
+    if fig is None:
+        return None
+    return figure_to_png(fig)
+# endregion
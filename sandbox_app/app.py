@@ -6,9 +6,20 @@ import urllib3
 import altair as alt
 import requests
 import io
+import threading
+import functools
+import os
+import sys
+from collections import OrderedDict
+
+# Les modules partagés (data_cache) sont à la racine du dépôt, au-dessus de sandbox_app/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_cache import ConditionalCsvFetcher, freeze_frame, DerivedCache, normalize_pseudo, build_participant_index
 
 # This line bypasses SSL verification.
 ssl._create_default_https_context = ssl._create_unverified_context
+# Same for requests (ConditionalCsvFetcher(verify=False)), without a warning on every download
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Configuration de la page (DOIT être la première commande st)
 st.set_page_config(
@@ -235,34 +246,101 @@ CATEGORY_QUESTIONS = [
 ]
 
 # --- DATA LOADING ---
-@st.cache_data(ttl=300)
+@st.cache_resource
+def get_csv_fetcher():
+    """Téléchargements conditionnels des liens CSV publiés, partagés par toutes les sessions."""
+    # Sans vérification du certificat, comme pd.read_csv avec le contournement SSL ci-dessus
+    return ConditionalCsvFetcher(verify=False)
+
+
+def fetch_csv(url):
+    # Même objet qu'avant si la feuille n'a pas changé : l'index des participants reste valable
+    return get_csv_fetcher().fetch(url, lambda body: freeze_frame(pd.read_csv(body, encoding='utf-8')))
+
+
+# cache_resource : toutes les sessions reçoivent le même objet, ce qui permet d'indexer une version des données une seule fois
+@st.cache_resource(ttl=300)
 def load_data(url):
     """Charge les données depuis le lien CSV publié."""
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        response.encoding = 'utf-8'
-        csv_data = io.StringIO(response.text)
-        df = pd.read_csv(csv_data)
+        # st.cache_resource fait déjà attendre les sessions qui ratent le cache en même temps
+        df = fetch_csv(url)
         return df
     except Exception as e:
         st.error(f"Erreur de chargement des données : {e}")
         return pd.DataFrame()
 
+
+@st.cache_resource
+def get_participant_index(code_col):
+    """Index code secret -> ligne, partagé par toutes les sessions et recalculé par version des données."""
+    return DerivedCache(lambda df: build_participant_index(df, code_col))
+
 # --- ENHANCED PLOTTING FUNCTIONS ---
+# Graphiques gardés d'un rerun à l'autre (les moins récemment utilisés sont retirés en premier)
+FIGURE_CACHE_SIZE = 128
+
+
+class FigureCache:
+    """LRU borné des graphiques déjà construits, indexé par tout ce qui sert à les construire."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # clé -> (données, graphique)
+
+    def get(self, key, build, df):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][1]
+
+        figure = build()
+        with self.lock:
+            # On garde une référence aux données : leur id() ne peut pas être réutilisé tant que l'entrée existe
+            self.entries[key] = (df, figure)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return figure
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache des graphiques partagé par toutes les sessions."""
+    return FigureCache(FIGURE_CACHE_SIZE)
+
+
+def cached_chart(builder):
+    """
+    Réutilise le graphique Altair déjà construit pour les mêmes entrées.
+    La version des données est l'objet DataFrame lui-même (même objet tant que la feuille n'a pas changé).
+    """
+    @functools.wraps(builder)
+    def wrapper(df, question_col, classifier_col, user_value, *args, **kwargs):
+        # Les fonctions lisent aussi le groupe du participant dans la variable globale user_data
+        user_group = user_data[classifier_col] if 'user_data' in globals() else None
+        key = (builder.__name__, id(df), question_col, classifier_col, user_value, user_group,
+               args, tuple(sorted(kwargs.items())))
+        return get_figure_cache().get(
+            key, lambda: builder(df, question_col, classifier_col, user_value, *args, **kwargs), df
+        )
+    return wrapper
+
 # Add this before the plot call to diagnose
 #st.write("Debug - Unique groups in data:", all_data[CLASSIFIER_COL].unique())
 #st.write("Debug - Group counts:", all_data[CLASSIFIER_COL].value_counts())
 #test_q = actual_col
 #st.write("Debug - Sample data:", all_data[[test_q, CLASSIFIER_COL]].head(10))
 
+@cached_chart
 def plot_numerical_comparison(df, question_col, classifier_col, user_value, show_other_groups=True, color_by_group=True):
     """
     Creates an enhanced histogram with modern design and mobile-friendly layout.
     Uses integer bins and highlights the user's response with grouped/dodged bars by classifier.
     """
-    # Prepare safe column names for Altair
-    df_plot = df.copy()
+    # Prepare safe column names for Altair (shallow copy: df is shared and read-only, copy-on-write does the rest)
+    df_plot = df.copy(deep=False)
     col_map = {col: (col.replace(':', '\\:') if isinstance(col, str) and ':' in col else col)
                for col in df_plot.columns}
     if any(col_map[c] != c for c in col_map):
@@ -411,13 +489,14 @@ def is_yes_no_question(df, question_col):
     return len(values_normalized) == 2
 
 
+@cached_chart
 def plot_pie_comparison(df, question_col, classifier_col, user_value, show_other_groups=True):
     """
     Creates pie charts for yes/no questions, one per group with modern styling.
     """
     user_group = user_data[classifier_col] if 'user_data' in globals() else None
 
-    df_plot = df.copy()
+    df_plot = df.copy(deep=False)
     if not show_other_groups and user_group:
         df_plot = df_plot[df_plot[classifier_col] == user_group]
 
@@ -544,11 +623,12 @@ def plot_pie_comparison(df, question_col, classifier_col, user_value, show_other
     )
 
 
+@cached_chart
 def plot_categorical_comparison(df, question_col, classifier_col, user_value, show_other_groups=True, color_by_group=True):
     """
     Creates an enhanced grouped bar chart for categorical questions with dodged bars.
     """
-    df_plot = df.copy()
+    df_plot = df.copy(deep=False)
     col_map = {col: (col.replace(':', '\\:') if isinstance(col, str) and ':' in col else col)
                for col in df_plot.columns}
     if any(col_map[c] != c for c in col_map):
@@ -681,17 +761,14 @@ if not user_id:
     st.info("💡 Entre ton code secret ci-dessus pour voir tes résultats personnalisés.")
     st.stop()
 
-# Filter user data
-try:
-    user_data_row = all_data[all_data[IDENTIFIER_COL].str.lower().str.strip() == user_id.lower().strip()]
-except AttributeError:
-    user_data_row = all_data[all_data[IDENTIFIER_COL] == user_id]
+# Find user data (dict lookup in the participant index)
+user_position = get_participant_index(IDENTIFIER_COL).get(all_data).get(normalize_pseudo(user_id))
 
-if user_data_row.empty:
+if user_position is None:
     st.error(f"❌ Code non trouvé: '{user_id}'. Vérifie l'orthographe et réessaie.")
     st.stop()
 
-user_data = user_data_row.iloc[0]
+user_data = all_data.iloc[user_position]
 user_classifier = user_data[CLASSIFIER_COL]
 
 # Success message with custom styling and group icon
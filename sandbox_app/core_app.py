@@ -6,6 +6,12 @@ import urllib3
 import altair as alt
 import requests
 import io
+import os
+import sys
+
+# Les modules partagés (data_cache) sont à la racine du dépôt, au-dessus de sandbox_app/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_cache import DerivedCache, normalize_pseudo, build_participant_index
 
 # This line bypasses SSL verification.
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -23,12 +29,18 @@ SHEET_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRCbQDPet7-hUdVO0-C
 
 
 # Charger les données et afficher les noms des colonnes
-@st.cache_data
+@st.cache_resource
 def load_data():
     df = pd.read_csv(SHEET_URL)
     return df
 
 
+@st.cache_resource
+def get_participant_index():
+    """Index code secret -> ligne, recalculé seulement quand de nouvelles données sont chargées."""
+    return DerivedCache(lambda data: build_participant_index(data, "Choisis ton code secret"))
+
+
 # Charger les données
 df = load_data()
 
@@ -55,9 +67,10 @@ participant_data = None
 valid_code = False
 
 if secret_code:
-    if secret_code in df["Choisis ton code secret"].values:
+    participant_position = get_participant_index().get(df).get(normalize_pseudo(secret_code))
+    if participant_position is not None:
         st.success("Code secret valide! Tu peux voir tes résultats.")
-        participant_data = df[df["Choisis ton code secret"] == secret_code].iloc[0]
+        participant_data = df.iloc[participant_position]
         valid_code = True
     else:
         st.error("Code secret invalide. Vérifie ton code et réessaie.")
@@ -0,0 +1,690 @@
+# Réponses du questionnaire MICAH (micah_sleepscreenai_app.py) : options de réponse et types des colonnes,
+# et objets partagés par le processus qui les lisent et les enregistrent (copie résidente de la feuille,
+# journal d'écriture différée, stockages SQLite et mode événement, cube de comptages, registre des pseudos).
+# Ce module ne dépend pas de Streamlit : l'application garde ses fonctions @st.cache_resource,
+# qui créent ces objets une fois par processus.
+
+# region imports
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+
+import gspread
+import pandas as pd
+import requests
+from google.auth.exceptions import GoogleAuthError
+
+from data_cache import freeze_frame, check_frame, normalize_pseudo
+
+logger = logging.getLogger(__name__)
+# endregion
+
+# region Options du questionnaire
+# Réponses des questions à choix unique, dans l'ordre affiché par l'application
+CATEGORY_OPTIONS = ["Ado (11-17 ans)", "Adulte"]
+SCREEN_HABIT_OPTIONS = ["Jamais", "Parfois", "Souvent", "Tous les soirs"]
+AI_FREQ_OPTIONS = ["Jamais", "Rarement", "Hebdomadaire", "Souvent", "Tous les jours"]
+CHATGPT_FEELINGS_OPTIONS = ["Oui", "Non", "Je ne sais pas"]
+
+# Réponses prédéfinies des questions à choix multiples
+# ("Autre" est ajouté par les widgets et stocké en texte libre)
+AI_PURPOSE_OPTIONS = ["Travail / Devoirs", "Loisirs", "Recherche d'info", "Compagnon virtuel", "Soutien psychologique"]
+AI_BENEFIT_OPTIONS = ["Pratique / Utile", "Rapide", "Ne me juge pas", "Suscite l'inspiration",
+                      "Sentiment d'accomplissement", "Pas de bénéfices"]
+AI_CONCERN_ITEMS_OPTIONS = ["Perte des capacités de réflexion critique", "Impact sur les générations futures",
+                            "Impact sur les industries artistiques et créatives", "Désinformation/mésinformation",
+                            "Impact sur le marché du travail", "Impact sur l'environnement",
+                            "Manque de confidentialité et de protection des données", "Je n'ai aucune inquiétude"]
+AI_RESPONSIBLE_PEOPLE_OPTIONS = ["Moi-même",
+                                 "Mes proches (amis, frères, soeurs)",
+                                 "L'école (ienseignants, bibliothécaires)",
+                                 "L'IA elle-même",
+                                 "Les grandes entreprise de la Tech (Tech companies)",
+                                 "Les parents / éducateurs",
+                                 "Des experts (chercheurs)",
+                                 "Le gouvernement"]
+AI_PREVENTION_CAMPAIGN_OPTIONS = ["Des explications plus simples et claires",
+                                  "Des vidéos courtes ou des tutoriels",
+                                  "Des influenceurs/ambassadeurs qui en parlent",
+                                  "Des ateliers ou démonstrations en classe",
+                                  "Des illustrations (publicités nationales radio/tv/réseaux sociaux)"]
+
+# Colonnes stockées en ", ".join(...) des réponses choisies
+MULTI_SELECT_OPTIONS = {
+    'AI_Purpose': AI_PURPOSE_OPTIONS,
+    'AI_Benefit': AI_BENEFIT_OPTIONS,
+    'AI_Concern_Items': AI_CONCERN_ITEMS_OPTIONS,
+    'AI_Responsible_People': AI_RESPONSIBLE_PEOPLE_OPTIONS,
+    'AI_Prevention_Campaign': AI_PREVENTION_CAMPAIGN_OPTIONS,
+}
+
+# Types appliqués au chargement : les listes d'options deviennent des Categorical (dans l'ordre de l'application),
+# les échelles des petits entiers nullables
+RESPONSE_SCHEMA = {
+    'Category': CATEGORY_OPTIONS,
+    'Screen_Habit': SCREEN_HABIT_OPTIONS,
+    'AI_Freq': AI_FREQ_OPTIONS,
+    'ChatGPT_Feelings': CHATGPT_FEELINGS_OPTIONS,
+    'AI_Benefit_Scale': 'Int8',
+    'AI_Concern_Scale': 'Int8',
+    'Timestamp': 'datetime',
+}
+
+# Colonnes de la feuille "Reponses", dans l'ordre de la feuille
+RESPONSE_COLUMNS = [
+    'Secret_Code', 'Category', 'Screen_Habit', 'AI_Freq', 'AI_Purpose', 'AI_Wordcloud_Input', 'AI_Benefit',
+    'AI_Benefit_Scale', 'ChatGPT_Feelings', 'AI_Concern_Scale', 'AI_Concern_Items', 'AI_Responsible_People',
+    'AI_Feature', 'AI_Prevention_Campaign', 'AI_Comments', 'Timestamp',
+]
+
+
+def apply_response_schema(df):
+    """Applique RESPONSE_SCHEMA aux réponses chargées ; les colonnes déjà typées restent telles quelles."""
+    typed = {}
+    for column, kind in RESPONSE_SCHEMA.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if isinstance(kind, list):
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                continue
+            # Cellule vide = réponse manquante ; les réponses inattendues sont gardées après celles déclarées
+            values = values.where(values.astype(str).str.strip() != '')
+            extra = [v for v in pd.unique(values.dropna()) if v not in kind]
+            typed[column] = pd.Categorical(values, categories=kind + extra)
+        elif kind == 'datetime':
+            if pd.api.types.is_datetime64_any_dtype(values):
+                continue
+            typed[column] = pd.to_datetime(values, errors='coerce', format='mixed')
+        else:
+            if values.dtype == kind:
+                continue
+            numbers = pd.to_numeric(values, errors='coerce')
+            # Ce qui n'est pas un petit nombre entier est traité comme une réponse manquante
+            numbers = numbers.where(numbers.between(-128, 127) & (numbers % 1 == 0))
+            typed[column] = numbers.astype(kind)
+
+    if not typed:
+        return df
+    return df.assign(**typed)
+# endregion
+
+# region Synchronisation de la feuille
+# Filet de sécurité contre les lignes modifiées ou supprimées directement dans la feuille
+FULL_RESYNC_SECONDS = 600
+
+
+def grid_row_count(sheet, first_row, refresh=False):
+    """
+    Nombre de lignes de la grille de la feuille. Le nombre en cache ne voit pas les lignes ajoutées par les autres
+    bornes : il est relu (une requête de métadonnées) quand first_row le dépasse, ou si `refresh`.
+    """
+    if sheet.row_count >= first_row and not refresh:
+        return sheet.row_count
+    try:
+        return sheet.spreadsheet.get_worksheet_by_id(sheet.id).row_count
+    except Exception:
+        return sheet.row_count
+
+
+class SheetSync:
+    """
+    Copie résidente d'une feuille, complétée par les lignes ajoutées depuis la dernière synchronisation.
+    Avec `columns`, seules ces colonnes sont lues (une plage par colonne, en un seul batch_get).
+    """
+
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.header = []
+        self.letters = []
+        self.marker = 'A'
+        self.rows_ingested = 0
+        self.frame = pd.DataFrame()
+        self.last_full_reload = 0.0
+        self.modified_time = None
+
+    def sync(self, sheet):
+        with self.lock:
+            if not self.header:
+                return self._full_reload(sheet)
+            if time.time() - self.last_full_reload > FULL_RESYNC_SECONDS:
+                if self.modified_time is not None and self._modified_time(sheet) == self.modified_time:
+                    # Rien n'a été écrit ni modifié depuis la dernière lecture complète : on garde le tableau
+                    self.last_full_reload = time.time()
+                    return self.frame
+                return self._full_reload(sheet)
+
+            # La ligne 1 est l'en-tête : la première nouvelle ligne est donc rows_ingested + 2
+            records = self._read_records(sheet, self.rows_ingested + 2)
+            if not records:
+                return self.frame
+
+            new_rows = apply_response_schema(pd.DataFrame(records, columns=self.header))
+            # Mêmes catégories des deux côtés : la concaténation reste typée ;
+            # on ne re-type que si une nouvelle réponse est apparue
+            self.frame = freeze_frame(apply_response_schema(pd.concat([self.frame, new_rows], ignore_index=True)))
+            self.rows_ingested += len(records)
+            # La feuille a changé depuis la dernière lecture complète : la prochaine resynchronisation doit la relire
+            self.modified_time = None
+            return self.frame
+
+    def _modified_time(self, sheet):
+        """modifiedTime Drive du classeur (une petite requête de métadonnées), ou None s'il n'est pas disponible."""
+        try:
+            return sheet.spreadsheet.get_lastUpdateTime()
+        except Exception:
+            return None
+
+    def _read_records(self, sheet, first_row, refresh_grid=False):
+        """
+        Lignes de first_row jusqu'à la fin, telles que get_all_records() les renvoie (limitées à la projection).
+        Un enregistrement par ligne de la feuille, lignes vides comprises : len() fait avancer rows_ingested.
+        """
+        # Une plage qui commence après la dernière ligne de la grille est refusée ("exceeds grid limits")
+        last_row = grid_row_count(sheet, first_row, refresh_grid)
+        if first_row > last_row:
+            return []
+        if self.columns is None:
+            last_col = gspread.utils.rowcol_to_a1(1, len(self.header))[:-1]
+            values = sheet.get_values(f"A{first_row}:{last_col}{last_row}")
+            values = gspread.utils.fill_gaps(values, cols=len(self.header))
+        else:
+            # Chaque plage s'arrête à sa dernière cellule non vide : on les complète jusqu'à la plus longue ;
+            # la colonne repère (toujours remplie) compte les lignes dont les cellules projetées sont toutes vides
+            ranges = [f"{letter}{first_row}:{letter}{last_row}" for letter in [self.marker] + self.letters]
+            columns = [[row[0] if row else '' for row in value_range] for value_range in sheet.batch_get(ranges)]
+            n_rows = max((len(column) for column in columns), default=0)
+            values = [[column[i] if i < len(column) else '' for column in columns[1:]] for i in range(n_rows)]
+        # Même conversion en nombres que get_all_records()
+        return [dict(zip(self.header, gspread.utils.numericise_all(row))) for row in values]
+
+    def _full_reload(self, sheet):
+        # Lu avant les valeurs : une modification faite pendant le téléchargement force le rechargement suivant
+        self.modified_time = self._modified_time(sheet)
+        if self.columns is None:
+            data = sheet.get_all_records()
+            self.frame = freeze_frame(apply_response_schema(pd.DataFrame(data)))
+            self.header = list(self.frame.columns)
+        else:
+            sheet_header = sheet.row_values(1)
+            positions = [i for i, name in enumerate(sheet_header, start=1) if name in self.columns]
+            self.header = [sheet_header[i - 1] for i in positions]
+            self.letters = [gspread.utils.rowcol_to_a1(1, i)[:-1] for i in positions]
+            marker = sheet_header.index('Timestamp') + 1 if 'Timestamp' in sheet_header else 1
+            self.marker = gspread.utils.rowcol_to_a1(1, marker)[:-1]
+            # La taille de grille de la feuille partagée date d'avant les ajouts des autres bornes :
+            # une lecture complète ne doit pas s'y arrêter
+            data = self._read_records(sheet, 2, refresh_grid=True) if self.header else []
+            self.frame = freeze_frame(apply_response_schema(pd.DataFrame(data, columns=self.header)))
+        self.rows_ingested = len(data)
+        self.last_full_reload = time.time()
+        return self.frame
+# endregion
+
+# region File des envois
+FLUSH_BATCH_SIZE = 50
+MAX_BACKOFF_SECONDS = 60
+
+
+def is_retryable(error):
+    """
+    Les erreurs de quota, de serveur, de réseau et d'identifiants sont réessayées ;
+    une requête refusée par la feuille (autre 4xx) ne l'est pas.
+    """
+    if isinstance(error, gspread.exceptions.APIError):
+        status = error.response.status_code
+        return status in (408, 429) or status >= 500
+    return isinstance(error, (requests.exceptions.RequestException, OSError, GoogleAuthError))
+
+
+class SubmissionWriter:
+    """
+    Journal local en ajout seul, vidé dans la feuille avec append_rows par un thread en arrière-plan.
+
+    Livraison au moins une fois : un envoi dont la réponse s'est perdue (connexion coupée) est renvoyé, la
+    feuille peut donc contenir deux fois le même envoi (même Secret_Code et Timestamp, voir submission_key).
+    Les lignes refusées par la feuille sont journalisées et déplacées dans `<journal>.rejected`
+    au lieu de bloquer la file.
+    """
+
+    def __init__(self, journal_path, flush):
+        self.journal_path = journal_path
+        self.offset_path = journal_path + ".offset"
+        self.rejected_path = journal_path + ".rejected"
+        self.flush = flush
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        self.flushed, self.pending = self._replay()
+        if self.pending:
+            self.wakeup.set()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _replay(self):
+        """Recharge les lignes journalisées par un processus précédent qui n'ont jamais atteint la feuille."""
+        flushed = 0
+        if os.path.exists(self.offset_path):
+            with open(self.offset_path, encoding="utf-8") as f:
+                flushed = int(f.read().strip() or 0)
+        rows = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        if flushed > len(rows):
+            # Arrêt brutal entre la troncature du journal et la remise à zéro de l'offset : tout avait été envoyé
+            flushed = 0
+        return flushed, rows[flushed:]
+
+    def _write_offset(self, flushed):
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(flushed))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def _set_aside(self, rows):
+        with open(self.rejected_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def submit(self, row):
+        """Journalise la ligne de façon durable et rend la main aussitôt ; la feuille est écrite plus tard."""
+        line = json.dumps(row, ensure_ascii=False)
+        with self.lock:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending.append(row)
+        self.wakeup.set()
+
+    def _run(self):
+        backoff = 1
+        isolating = 0  # lignes d'un lot refusé qui restent à envoyer une par une
+        while True:
+            self.wakeup.wait()
+            with self.lock:
+                batch = self.pending[:1 if isolating else FLUSH_BATCH_SIZE]
+                if not batch:
+                    self.wakeup.clear()
+                    continue
+            try:
+                self.flush(batch)
+            except Exception as e:
+                if is_retryable(e):
+                    # On garde les lignes et on réessaie avec un délai exponentiel
+                    time.sleep(backoff + random.uniform(0, 1))
+                    backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+                    continue
+                if len(batch) > 1:
+                    # La feuille a refusé le lot : on renvoie ses lignes une par une pour trouver les fautives
+                    isolating = len(batch)
+                    continue
+                logger.error("Submission rejected by the sheet, moved to %s: %s", self.rejected_path, e)
+                self._set_aside(batch)
+            backoff = 1
+            isolating = max(isolating - len(batch), 0)
+            with self.lock:
+                del self.pending[:len(batch)]
+                if self.pending:
+                    self.flushed += len(batch)
+                    self._write_offset(self.flushed)
+                else:
+                    # Tout a atteint la feuille : on compacte le journal.
+                    # Le journal d'abord : un arrêt entre les deux laisse un offset au-delà de sa fin,
+                    # que _replay lit comme 0 (remettre l'offset à zéro d'abord rejouerait,
+                    # et dupliquerait, toutes les lignes envoyées).
+                    open(self.journal_path, "w").close()
+                    self.flushed = 0
+                    self._write_offset(0)
+# endregion
+
+# region Stockages
+EVENT_SYNC_SECONDS = 15
+
+
+class StorageBackend:
+    """Où vivent les réponses. Les pages ne les lisent et ne les écrivent qu'avec ces opérations."""
+
+    name = None
+
+    def append(self, responses):
+        """Enregistre un envoi (colonne -> valeur)."""
+        raise NotImplementedError
+
+    def scan(self):
+        """Toutes les réponses, en tableau typé."""
+        return self.project(None)
+
+    def project(self, columns):
+        """Les réponses limitées à `columns` (toutes si None)."""
+        raise NotImplementedError
+
+    def lookup(self, code):
+        """La première ligne répondue avec ce pseudo, ou None."""
+        raise NotImplementedError
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Fichier SQLite local avec les colonnes de la feuille, indexé sur Category, Timestamp et le pseudo normalisé.
+    Le pseudo est normalisé en Python (normalize_pseudo) dans sa propre colonne : COLLATE NOCASE ne replie que l'ASCII.
+    """
+
+    def __init__(self, path):
+        self.name = f"sqlite:{path}"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Une connexion partagée par les threads des sessions, sérialisée par le verrou
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.frames = {}  # projection -> (version des données, tableau)
+
+        columns = ", ".join(f'"{column}"' for column in RESPONSE_COLUMNS)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS responses ({columns}, pseudo_key)")
+            existing = [row[1] for row in self.connection.execute("PRAGMA table_info(responses)")]
+            if "pseudo_key" not in existing:
+                # Fichiers créés avant la colonne pseudo_key : on la remplit à partir des pseudos enregistrés
+                self.connection.execute("ALTER TABLE responses ADD COLUMN pseudo_key")
+                self.connection.create_function("normalize_pseudo", 1, normalize_pseudo, deterministic=True)
+                self.connection.execute(
+                    'UPDATE responses SET pseudo_key = normalize_pseudo("Secret_Code") WHERE "Secret_Code" IS NOT NULL'
+                )
+            self.connection.execute("DROP INDEX IF EXISTS idx_responses_secret_code")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_responses_pseudo_key ON responses (pseudo_key)")
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_responses_category ON responses ("Category")')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_responses_timestamp ON responses ("Timestamp")')
+
+    def _data_version(self):
+        # data_version change aux commits des autres connexions, total_changes à nos propres écritures
+        return self.connection.execute("PRAGMA data_version").fetchone()[0], self.connection.total_changes
+
+    def append(self, responses):
+        with self.lock, self.connection:
+            self._insert(responses)
+
+    def _insert(self, responses):
+        """Insère une ligne dans la transaction de l'appelant et renvoie son rowid."""
+        columns = ", ".join(f'"{column}"' for column in RESPONSE_COLUMNS)
+        placeholders = ", ".join("?" for _ in RESPONSE_COLUMNS)
+        values = [responses.get(column, "") for column in RESPONSE_COLUMNS]
+        return self.connection.execute(
+            f"INSERT INTO responses ({columns}, pseudo_key) VALUES ({placeholders}, ?)",
+            values + [normalize_pseudo(responses.get('Secret_Code', ''))]
+        ).lastrowid
+
+    def project(self, columns):
+        with self.lock:
+            # Même objet tableau tant que rien n'a été écrit, comme le tableau résident de Sheets
+            version = self._data_version()
+            cached = self.frames.get(columns)
+            if cached is not None and cached[0] == version:
+                return check_frame(cached[1])
+
+            selected = ", ".join(
+                f'"{column}"' for column in RESPONSE_COLUMNS if columns is None or column in columns
+            )
+            query = f"SELECT {selected} FROM responses ORDER BY rowid"
+            frame = freeze_frame(apply_response_schema(pd.read_sql_query(query, self.connection)))
+            self.frames[columns] = (version, frame)
+            return frame
+
+    def lookup(self, code):
+        columns = ", ".join(f'"{column}"' for column in RESPONSE_COLUMNS)
+        with self.lock:
+            rows = pd.read_sql_query(
+                f"SELECT {columns} FROM responses WHERE pseudo_key = ? ORDER BY rowid LIMIT 1",
+                self.connection, params=(normalize_pseudo(code),)
+            )
+        return None if rows.empty else apply_response_schema(rows).iloc[0]
+
+
+class ReplicatedBackend(SQLiteBackend):
+    """
+    Mode événement : une réplique SQLite locale sert toutes les lectures et prend tous les envois aussitôt.
+    Un thread de réconciliation pousse les lignes locales vers la feuille et récupère celles des autres bornes.
+    """
+
+    def __init__(self, path, sheet_id, worksheet_name, sheet_pool):
+        super().__init__(path)
+        self.name = f"event:{path}"
+        self.sheet_id = sheet_id
+        self.worksheet_name = worksheet_name
+        self.sheet_pool = sheet_pool
+        self.header = []
+        with self.lock, self.connection:
+            # Lignes locales pas encore poussées vers la feuille, et nombre de lignes de la feuille récupérées
+            self.connection.execute("CREATE TABLE IF NOT EXISTS outbox (response_id INTEGER PRIMARY KEY)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value)")
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def append(self, responses):
+        with self.lock, self.connection:
+            response_id = self._insert(responses)
+            self.connection.execute("INSERT INTO outbox VALUES (?)", (response_id,))
+
+    def _run(self):
+        delay = EVENT_SYNC_SECONDS
+        while True:
+            try:
+                self.sheet_pool.run(self.sheet_id, self.worksheet_name, self.reconcile, idempotent=False)
+                delay = EVENT_SYNC_SECONDS
+            except Exception:
+                # Hors ligne : la réplique continue de servir les pages, l'outbox est poussée à un tour suivant
+                delay = min(delay * 2, MAX_BACKOFF_SECONDS)
+            time.sleep(delay + random.uniform(0, 1))
+
+    def reconcile(self, sheet):
+        """Un tour d'envoi puis de récupération avec la feuille."""
+        if not self.header:
+            self.header = sheet.row_values(1) or list(RESPONSE_COLUMNS)
+        self._push(sheet)
+        self._pull(sheet)
+
+    def _push(self, sheet):
+        columns = ", ".join(f'responses."{column}"' for column in RESPONSE_COLUMNS)
+        while True:
+            with self.lock:
+                pending = self.connection.execute(
+                    f"SELECT outbox.response_id, {columns} FROM outbox "
+                    f"JOIN responses ON responses.rowid = outbox.response_id "
+                    f"ORDER BY outbox.response_id LIMIT ?", (FLUSH_BATCH_SIZE,)
+                ).fetchall()
+            if not pending:
+                return
+
+            # Dans l'ordre des colonnes de la feuille ;
+            # les NULL (colonnes inconnues de la réplique) deviennent des cellules vides
+            records = [dict(zip(RESPONSE_COLUMNS, row[1:])) for row in pending]
+            rows = [["" if record.get(name) is None else record[name] for name in self.header] for record in records]
+            # RAW garde le texte du Timestamp tel quel : la ligne est reconnue quand elle revient
+            sheet.append_rows(rows, value_input_option='RAW')
+            with self.lock, self.connection:
+                self.connection.executemany("DELETE FROM outbox WHERE response_id = ?", [(row[0],) for row in pending])
+
+    def _pull(self, sheet):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM sync_state WHERE key = 'sheet_rows'").fetchone()
+        sheet_rows = 0 if row is None else row[0]
+
+        # La ligne 1 est l'en-tête : la première ligne pas encore récupérée est donc sheet_rows + 2
+        first_row = sheet_rows + 2
+        last_row = grid_row_count(sheet, first_row)
+        if first_row > last_row:
+            return
+        last_col = gspread.utils.rowcol_to_a1(1, len(self.header))[:-1]
+        values = sheet.get_values(f"A{first_row}:{last_col}{last_row}")
+        if not values:
+            return
+
+        # Même complément et conversion en nombres que get_all_records() ; pseudos et horodatages restent du texte
+        values = gspread.utils.fill_gaps(values, cols=len(self.header))
+        text_columns = [i for i, name in enumerate(self.header, start=1) if name in ('Secret_Code', 'Timestamp')]
+        records = [dict(zip(self.header, gspread.utils.numericise_all(row, ignore=text_columns))) for row in values]
+
+        with self.lock, self.connection:
+            # Nos lignes poussées (et celles récupérées avant un redémarrage) reviennent aussi : on les ignore
+            known = {
+                (normalize_pseudo(code), str(timestamp))
+                for code, timestamp in self.connection.execute('SELECT "Secret_Code", "Timestamp" FROM responses')
+            }
+            for record in records:
+                key = (normalize_pseudo(record.get('Secret_Code', '')), str(record.get('Timestamp', '')))
+                if key not in known:
+                    known.add(key)
+                    self._insert(record)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('sheet_rows', ?)", (sheet_rows + len(values),)
+            )
+# endregion
+
+# region Agrégats
+def submission_key(code):
+    """Secret_Code tel que relu dans la feuille : "007" devient 7, et une colonne avec des trous contient 7.0."""
+    value = gspread.utils.numericise(str(code).strip())
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return normalize_pseudo(value)
+
+
+class CountCube:
+    """Comptages des réponses par (Category, colonne de la question, option).
+
+    Construit une fois à partir des données chargées, complété par les lignes ajoutées depuis la dernière
+    synchronisation, et mis à jour dès chaque envoi réussi : les graphiques n'ont plus à parcourir les réponses.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # (colonne, option) -> Counter des valeurs brutes de Category
+        self.sheet_counts = defaultdict(Counter)
+        self.frame = None
+        self.rows_seen = 0
+        self.last_rebuild = time.time()
+        # Envois comptés à l'enregistrement mais pas encore relus dans la feuille, par Secret_Code
+        self.pending = {}
+
+    def sync(self, df):
+        """Ajoute au cube les lignes ajoutées à df depuis la synchronisation précédente."""
+        with self.lock:
+            if df is self.frame:
+                return
+            # Les tableaux chargés ne font que grandir ; on reconstruit si ce n'est plus vrai, ou de temps en temps.
+            # Une reconstruction compte toutes les lignes du tableau complet :
+            # les envois en attente partent avec le reste
+            if len(df) < self.rows_seen or time.time() - self.last_rebuild > FULL_RESYNC_SECONDS:
+                self.reset()
+
+            new_rows = df.iloc[self.rows_seen:]
+            if 'Category' in new_rows.columns:
+                for column in self.columns:
+                    if column not in new_rows.columns:
+                        continue
+                    sizes = new_rows.groupby(['Category', column], observed=True).size()
+                    for (category, option), count in sizes.items():
+                        self.sheet_counts[(column, option)][str(category)] += int(count)
+
+                # Les envois désormais présents dans la feuille y sont comptés, et ne sont plus en attente
+                if 'Secret_Code' in new_rows.columns and self.pending:
+                    for code in new_rows['Secret_Code'].tolist():
+                        self.pending.pop(submission_key(code), None)
+
+            self.frame = df
+            self.rows_seen = len(df)
+
+    def add_submission(self, responses):
+        """Compte un envoi enregistré avec succès avant qu'il ne soit relu dans la feuille."""
+        with self.lock:
+            self.pending[submission_key(responses.get('Secret_Code', ''))] = dict(responses)
+
+    def counts(self, category, column, options):
+        """Même résultat que filtrer sur category[:3] et compter les options, sans toucher aux lignes."""
+        with self.lock:
+            prefix = category[:3].lower()
+            final_counts = []
+            for option in options:
+                by_category = self.sheet_counts.get((column, option), {})
+                count = sum(n for cat, n in by_category.items() if prefix in cat.lower())
+                count += sum(
+                    1 for responses in self.pending.values()
+                    if responses.get(column) == option and prefix in str(responses.get('Category', '')).lower()
+                )
+                final_counts.append(count)
+            return final_counts
+
+
+# Un pseudo choisi à l'étape 1 reste réservé à sa session pendant cette durée (assez pour finir le questionnaire)
+PSEUDO_RESERVATION_SECONDS = 3600
+
+
+class PseudoRegistry:
+    """
+    Ensemble des pseudos déjà dans la feuille, plus ceux réservés par les sessions qui répondent encore.
+    Vérifier un pseudo est une recherche dans un ensemble ;
+    la feuille n'est lue qu'une fois (colonne Secret_Code) pour le construire.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.taken = set()
+        self.reservations = {}  # pseudo -> (id de session, heure d'expiration)
+        self.frame = None
+        self.rows_seen = 0
+
+    def add_codes(self, codes):
+        with self.lock:
+            self.taken.update(normalize_pseudo(code) for code in codes if str(code).strip())
+
+    def sync(self, df):
+        """Ajoute les pseudos des lignes arrivées depuis le dernier tableau lu (réponses des autres bornes)."""
+        if df is self.frame or 'Secret_Code' not in df.columns:
+            return
+        start = self.rows_seen if len(df) >= self.rows_seen else 0
+        self.add_codes(df['Secret_Code'].iloc[start:].tolist())
+        with self.lock:
+            self.frame = df
+            self.rows_seen = len(df)
+
+    def reserve(self, code, owner):
+        """Vérifie que le pseudo est libre et le réserve pour la session `owner`, en une seule opération atomique."""
+        code = normalize_pseudo(code)
+        now = time.time()
+        with self.lock:
+            if code in self.taken:
+                return False
+            holder = self.reservations.get(code)
+            if holder is not None and holder[0] != owner and holder[1] > now:
+                return False
+            # Une session ne réserve qu'un pseudo (revenir à l'étape 1 libère le précédent)
+            for reserved, (session_id, expires_at) in list(self.reservations.items()):
+                if session_id == owner or expires_at <= now:
+                    del self.reservations[reserved]
+            self.reservations[code] = (owner, now + PSEUDO_RESERVATION_SECONDS)
+            return True
+
+    def commit(self, code):
+        """Marque le pseudo comme utilisé une fois ses réponses enregistrées."""
+        code = normalize_pseudo(code)
+        with self.lock:
+            self.taken.add(code)
+            self.reservations.pop(code, None)
+# endregion
@@ -0,0 +1,5 @@
+# The shared modules (data_cache, survey_store) are at the repository root, above tests/
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
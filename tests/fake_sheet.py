@@ -0,0 +1,94 @@
+import gspread
+
+
+class FakeSpreadsheet:
+    """Cells shared by every worksheet handle, kept as text like the Sheets API returns them."""
+
+    def __init__(self, header, rows=()):
+        self.cells = [list(header)] + [self.text(row) for row in rows]
+        self.grid_rows = len(self.cells)
+        self.last_update = 0
+        self.calls = []
+
+    @staticmethod
+    def text(row):
+        return ["" if value is None else str(value) for value in row]
+
+    def get_lastUpdateTime(self):
+        self.calls.append('modifiedTime')
+        return self.last_update
+
+    def get_worksheet_by_id(self, worksheet_id):
+        self.calls.append('worksheet metadata')
+        return FakeWorksheet(spreadsheet=self)
+
+
+class FakeWorksheet:
+    """
+    Worksheet handle answering the gspread calls of SheetSync and the backends. The grid grows on
+    append_rows, ranges past it are rejected, and row_count keeps the size seen when the handle was
+    opened, like gspread's cached properties.
+    """
+
+    id = 0
+
+    def __init__(self, header=(), rows=(), spreadsheet=None):
+        self.spreadsheet = spreadsheet or FakeSpreadsheet(header, rows)
+        self.row_count = self.spreadsheet.grid_rows
+
+    @property
+    def cells(self):
+        return self.spreadsheet.cells
+
+    @property
+    def calls(self):
+        return self.spreadsheet.calls
+
+    def _read(self, a1_range):
+        start, end = a1_range.split(':')
+        first_row, first_col = gspread.utils.a1_to_rowcol(start)
+        last_row, last_col = gspread.utils.a1_to_rowcol(end)
+        if last_row > self.spreadsheet.grid_rows:
+            raise ValueError(f"Range ({a1_range}) exceeds grid limits")
+        rows = []
+        for row in self.cells[first_row - 1:last_row]:
+            row = row[first_col - 1:last_col]
+            while row and row[-1] == '':
+                row = row[:-1]
+            rows.append(row)
+        # Like the API: trailing empty rows and cells are not returned
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def row_values(self, row):
+        self.calls.append(('row_values', row))
+        return self._read(f"A{row}:ZZ{row}")[0] if row <= len(self.cells) else []
+
+    def get_values(self, a1_range):
+        self.calls.append(('get_values', a1_range))
+        return self._read(a1_range)
+
+    def batch_get(self, ranges):
+        self.calls.append(('batch_get', tuple(ranges)))
+        return [self._read(a1_range) for a1_range in ranges]
+
+    def get_all_records(self):
+        self.calls.append('get_all_records')
+        header = self.cells[0]
+        rows = gspread.utils.fill_gaps(self.cells[1:], cols=len(header))
+        return [dict(zip(header, gspread.utils.numericise_all(row))) for row in rows]
+
+    def append_rows(self, rows, value_input_option='RAW'):
+        self.calls.append(('append_rows', len(rows)))
+        self.cells.extend(self.spreadsheet.text(row) for row in rows)
+        self.spreadsheet.grid_rows = max(self.spreadsheet.grid_rows, len(self.cells))
+        self.spreadsheet.last_update += 1
+
+
+HEADER = ['Secret_Code', 'Category', 'Screen_Habit', 'Timestamp']
+
+
+def response(code, category='Adulte', habit='Souvent', minute=0):
+    """One row of a HEADER worksheet."""
+    return [code, category, habit, f"2026-05-01T10:{minute:02d}:00"]
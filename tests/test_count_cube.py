@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from survey_store import SCREEN_HABIT_OPTIONS, apply_response_schema, CountCube
+from fake_sheet import HEADER, response
+
+
+def responses_frame(rows):
+    return apply_response_schema(pd.DataFrame(rows, columns=HEADER))
+
+
+def adult_counts(cube):
+    return dict(zip(SCREEN_HABIT_OPTIONS, cube.counts('Adulte', 'Screen_Habit', SCREEN_HABIT_OPTIONS)))
+
+
+@pytest.mark.parametrize("read_back", [7, 7.0, "007"])
+def test_count_cube_pending_submission_is_counted_once(read_back):
+    cube = CountCube(['Screen_Habit'])
+    rows = [response('A1'), response('B2', 'Ado (11-17 ans)')]
+    cube.sync(responses_frame(rows))
+    assert adult_counts(cube)['Souvent'] == 1
+
+    cube.add_submission({'Secret_Code': '007', 'Category': 'Adulte', 'Screen_Habit': 'Jamais'})
+    assert adult_counts(cube)['Jamais'] == 1
+
+    # The sheet numericises "007", so the row comes back as 7 (or 7.0 in a column with gaps)
+    cube.sync(responses_frame(rows + [response(read_back, habit='Jamais', minute=1)]))
+    assert cube.pending == {}
+    assert adult_counts(cube)['Jamais'] == 1
+
+
+def test_count_cube_rebuild_drops_pending_submissions():
+    cube = CountCube(['Screen_Habit'])
+    rows = [response('A1'), response('B2')]
+    cube.sync(responses_frame(rows))
+    cube.add_submission({'Secret_Code': 'C3', 'Category': 'Adulte', 'Screen_Habit': 'Parfois'})
+
+    # A shorter frame (rows deleted in the sheet) rebuilds the cube from scratch
+    cube.sync(responses_frame(rows[:1]))
+    assert cube.pending == {}
+    assert adult_counts(cube) == {'Jamais': 0, 'Parfois': 0, 'Souvent': 1, 'Tous les soirs': 0}
@@ -0,0 +1,247 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import data_cache
+from data_cache import SingleFlight, StaleWhileRevalidateCache, ConditionalCsvFetcher, freeze_frame, check_frame
+
+
+# region SingleFlight
+def test_single_flight_concurrent_calls_share_one_load():
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    loads = []
+    results = []
+
+    def load():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    def call():
+        results.append(single_flight.do("key", load))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=call) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.2)  # let the followers join the load in flight
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert len(loads) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+
+
+def test_single_flight_error_reaches_every_caller_and_is_not_kept():
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("sheet unavailable")
+
+    def call():
+        try:
+            single_flight.do("key", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.2)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    # The next call loads again instead of replaying the error
+    assert single_flight.do("key", lambda: 42) == 42
+    assert single_flight.calls == {}
+# endregion
+
+
+# region StaleWhileRevalidateCache
+def counting_fetch(values):
+    """fetch() returning the next value of `values` on each call, and the list of calls made."""
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return values[len(calls) - 1]
+    return fetch, calls
+
+
+def wait_for_refresh(cache, key):
+    deadline = time.monotonic() + 5
+    while True:
+        with cache.lock:
+            if key not in cache.refreshing:
+                return
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_swr_fresh_value_is_served_from_the_cache():
+    cache = StaleWhileRevalidateCache(SingleFlight())
+    fetch, calls = counting_fetch(["v1", "v2"])
+
+    assert cache.get("key", fetch, soft_ttl=60, hard_ttl=600) == "v1"
+    assert cache.get("key", fetch, soft_ttl=60, hard_ttl=600) == "v1"
+    assert len(calls) == 1
+
+
+def test_swr_stale_value_is_served_while_refreshing():
+    cache = StaleWhileRevalidateCache(SingleFlight())
+    fetch, calls = counting_fetch(["v1", "v2"])
+    cache.get("key", fetch, soft_ttl=60, hard_ttl=600)
+
+    # Past the soft TTL: the old value comes back at once and one refresh runs in the background
+    assert cache.get("key", fetch, soft_ttl=0, hard_ttl=600) == "v1"
+    wait_for_refresh(cache, "key")
+    assert len(calls) == 2
+    assert cache.get("key", fetch, soft_ttl=60, hard_ttl=600) == "v2"
+
+
+def test_swr_failed_background_refresh_keeps_the_old_value():
+    cache = StaleWhileRevalidateCache(SingleFlight())
+    cache.get("key", lambda: "v1", soft_ttl=60, hard_ttl=600)
+
+    def fail():
+        raise ConnectionError("offline")
+
+    assert cache.get("key", fail, soft_ttl=0, hard_ttl=600) == "v1"
+    wait_for_refresh(cache, "key")
+    assert cache.get("key", fail, soft_ttl=60, hard_ttl=600) == "v1"
+
+
+def test_swr_expired_value_blocks_on_the_refresh():
+    cache = StaleWhileRevalidateCache(SingleFlight())
+    fetch, calls = counting_fetch(["v1", "v2"])
+    cache.get("key", fetch, soft_ttl=60, hard_ttl=600)
+
+    assert cache.get("key", fetch, soft_ttl=0, hard_ttl=0) == "v2"
+    assert cache.refreshing == set()
+# endregion
+
+
+# region ConditionalCsvFetcher
+class FakeCsvServer:
+    """Stands in for requests.get: answers 304 to a matching If-None-Match, the current body otherwise."""
+
+    def __init__(self, body, etag=None):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, headers, timeout, verify):
+        self.requests.append({"headers": headers, "verify": verify})
+        if self.etag is not None and headers.get('If-None-Match') == self.etag:
+            return SimpleNamespace(status_code=304, headers={}, content=b"")
+        headers = {'ETag': self.etag} if self.etag else {}
+        return SimpleNamespace(status_code=200, headers=headers, content=self.body, raise_for_status=lambda: None)
+
+
+def counting_parse(calls):
+    def parse(body):
+        calls.append(1)
+        return pd.read_csv(body)
+    return parse
+
+
+def test_csv_fetcher_not_modified_reuses_the_frame(monkeypatch):
+    server = FakeCsvServer(b"Secret_Code\nA1\n", etag='"v1"')
+    monkeypatch.setattr(data_cache.requests, "get", server.get)
+    fetcher, parses = ConditionalCsvFetcher(), []
+
+    frame = fetcher.fetch("https://example.org/pub.csv", counting_parse(parses))
+    assert fetcher.fetch("https://example.org/pub.csv", counting_parse(parses)) is frame
+    assert server.requests[1]["headers"] == {'If-None-Match': '"v1"'}
+    assert len(parses) == 1
+
+
+def test_csv_fetcher_same_body_without_etag_is_not_parsed_again(monkeypatch):
+    server = FakeCsvServer(b"Secret_Code\nA1\n")
+    monkeypatch.setattr(data_cache.requests, "get", server.get)
+    fetcher, parses = ConditionalCsvFetcher(), []
+
+    frame = fetcher.fetch("https://example.org/pub.csv", counting_parse(parses))
+    assert fetcher.fetch("https://example.org/pub.csv", counting_parse(parses)) is frame
+    assert len(parses) == 1
+
+    server.body = b"Secret_Code\nA1\nB2\n"
+    assert fetcher.fetch("https://example.org/pub.csv", counting_parse(parses))['Secret_Code'].tolist() == ['A1', 'B2']
+    assert len(parses) == 2
+
+
+def test_csv_fetcher_certificate_verification(monkeypatch):
+    server = FakeCsvServer(b"Secret_Code\nA1\n")
+    monkeypatch.setattr(data_cache.requests, "get", server.get)
+
+    ConditionalCsvFetcher().fetch("https://example.org/pub.csv", pd.read_csv)
+    ConditionalCsvFetcher(verify=False).fetch("https://example.org/pub.csv", pd.read_csv)
+    assert [request["verify"] for request in server.requests] == [True, False]
+# endregion
+
+
+# region freeze_frame
+def survey_frame():
+    return pd.DataFrame({
+        'Secret_Code': ['A1', 'B2'],
+        'Sleep_Hours': [7, 6],
+        'Timestamp': pd.to_datetime(['2026-05-01 10:00', '2026-05-01 10:05']),
+        'Category': pd.Categorical(['Adulte', 'Adolescent']),
+    })
+
+
+@pytest.mark.parametrize("column, value", [
+    ('Secret_Code', 'zz'), ('Sleep_Hours', 0), ('Category', 'Adulte'),
+])
+def test_frozen_frame_refuses_cell_writes(column, value):
+    source = survey_frame()
+    frozen = freeze_frame(source)
+
+    with pytest.raises(ValueError):
+        frozen.loc[1, column] = value
+    with pytest.raises(ValueError):
+        frozen.iloc[1, frozen.columns.get_loc(column)] = value
+    assert frozen[column].tolist() == source[column].tolist() == survey_frame()[column].tolist()
+    check_frame(frozen)
+
+
+@pytest.mark.parametrize("modify", [
+    lambda df: df.__setitem__('Secret_Code', 'zz'),
+    lambda df: df.__setitem__('Sleep_Hours', 0),
+    lambda df: df.__setitem__('Extra', 1),
+    lambda df: df.sort_values('Sleep_Hours', inplace=True),
+    lambda df: df.drop(index=0, inplace=True),
+], ids=["replace text", "replace number", "add column", "sort", "drop row"])
+def test_check_frame_catches_in_place_changes(modify):
+    frozen = freeze_frame(survey_frame())
+    modify(frozen)
+    with pytest.raises(RuntimeError):
+        check_frame(frozen)
+
+
+def test_frame_derived_from_a_frozen_frame_is_writable():
+    frozen = freeze_frame(survey_frame())
+    derived = frozen.copy(deep=False)
+    derived.loc[0, 'Secret_Code'] = 'zz'
+    derived['Sleep_Hours'] = 0
+
+    assert check_frame(frozen) is frozen
+    assert frozen['Secret_Code'].tolist() == ['A1', 'B2']
+    assert frozen['Sleep_Hours'].tolist() == [7, 6]
+# endregion
@@ -0,0 +1,51 @@
+import threading
+
+import pandas as pd
+
+import survey_store
+from survey_store import PseudoRegistry
+
+
+def test_pseudo_registry_one_winner_per_pseudo():
+    registry = PseudoRegistry()
+    sessions = 16
+    barrier = threading.Barrier(sessions)
+    results = [None] * sessions
+
+    def reserve(i):
+        barrier.wait()
+        results[i] = registry.reserve('Luna', f"session-{i}")
+
+    threads = [threading.Thread(target=reserve, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+
+
+def test_pseudo_registry_rejects_taken_pseudos():
+    registry = PseudoRegistry()
+    registry.sync(pd.DataFrame({'Secret_Code': [' luna ', 'Élodie']}))
+
+    assert not registry.reserve('LUNA', "s1")
+    assert not registry.reserve('élodie', "s1")
+    assert registry.reserve('Sol', "s1")
+    registry.commit('sol')
+    assert not registry.reserve('Sol', "s1")
+
+
+def test_pseudo_registry_session_holds_one_pseudo():
+    registry = PseudoRegistry()
+    assert registry.reserve('Luna', "s1")
+    assert registry.reserve('Sol', "s1")
+    assert registry.reserve('Luna', "s2")
+    assert not registry.reserve('Sol', "s2")
+
+
+def test_pseudo_registry_expired_reservation_is_released(monkeypatch):
+    monkeypatch.setattr(survey_store, 'PSEUDO_RESERVATION_SECONDS', -1)
+    registry = PseudoRegistry()
+    assert registry.reserve('Luna', "s1")
+    assert registry.reserve('Luna', "s2")
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+import render_worker
+from render_worker import RenderService
+
+
+class FakeWorker:
+    """Renders "hang" until it is killed, and any other chart at once."""
+
+    created = []
+
+    def __init__(self):
+        self.killed = threading.Event()
+        FakeWorker.created.append(self)
+
+    def render(self, chart, args):
+        if chart == "hang":
+            if self.killed.wait(10):
+                raise EOFError("render worker exited")
+            return b"late"
+        return b"png"
+
+    def close(self):
+        self.killed.set()
+
+
+@pytest.fixture
+def fake_workers(monkeypatch):
+    FakeWorker.created = []
+    monkeypatch.setattr(render_worker, "RenderWorker", FakeWorker)
+    return FakeWorker.created
+
+
+def test_render_timeout_kills_the_worker_and_frees_its_slot(fake_workers):
+    service = RenderService(workers=1, queue_size=0, timeout=0.5)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        service.render("hang")
+    assert time.monotonic() - started < 2
+    assert fake_workers[0].killed.is_set()
+
+    # The only slot and the only process were given back: the next render does not wait for the hung one
+    assert service.render("likert") == b"png"
+    assert len(fake_workers) == 2
+
+
+def test_render_in_a_worker_process():
+    service = RenderService(workers=1, queue_size=0, timeout=60)
+    png = service.render("likert", [("Oui", 3), ("Non", 1)], 4, "Titre", "Oui")
+    assert png.startswith(b"\x89PNG")
+    service.idle.get().close()
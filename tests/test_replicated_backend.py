@@ -0,0 +1,43 @@
+import pytest
+
+from survey_store import RESPONSE_COLUMNS, ReplicatedBackend
+from fake_sheet import FakeWorksheet, HEADER, response
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    # Rounds are driven by the tests instead of the background reconciler
+    monkeypatch.setattr(ReplicatedBackend, '_run', lambda self: None)
+    return ReplicatedBackend(str(tmp_path / "replica.sqlite3"), "sheet", "Reponses", sheet_pool=None)
+
+
+def remote_response(code, minute):
+    record = dict(zip(HEADER, response(code, minute=minute)))
+    return [record.get(column, "") for column in RESPONSE_COLUMNS]
+
+
+def test_replica_pushes_local_rows_and_pulls_remote_ones(replica):
+    sheet = FakeWorksheet(RESPONSE_COLUMNS, [remote_response('007', 0)])
+    replica.append({'Secret_Code': 'Luna', 'Category': 'Adulte', 'Timestamp': '2026-05-01T11:00:00'})
+
+    replica.reconcile(sheet)
+    replica.reconcile(sheet)
+
+    assert [row[0] for row in sheet.cells[1:]] == ['007', 'Luna']
+    assert replica.connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 0
+    # The pushed row comes back from the sheet and is recognised instead of being inserted twice
+    assert sorted(replica.scan()['Secret_Code'].tolist()) == ['007', 'Luna']
+    assert replica.lookup('007') is not None
+
+
+def test_replica_pull_stops_at_the_grid(replica):
+    sheet = FakeWorksheet(RESPONSE_COLUMNS, [remote_response('A1', 0)])
+    replica.reconcile(sheet)
+
+    sheet.append_rows([remote_response('B2', 1), remote_response('C3', 2)])
+    replica.reconcile(sheet)
+    replica.reconcile(sheet)
+
+    assert replica.scan()['Secret_Code'].tolist() == ['A1', 'B2', 'C3']
+    state = replica.connection.execute("SELECT value FROM sync_state WHERE key = 'sheet_rows'").fetchone()
+    assert state[0] == 3
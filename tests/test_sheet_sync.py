@@ -0,0 +1,83 @@
+import pandas as pd
+
+import survey_store
+from survey_store import SheetSync
+from fake_sheet import FakeWorksheet, HEADER, response
+
+
+def test_sheet_sync_reads_only_the_appended_rows():
+    sheet = FakeWorksheet(HEADER, [response('A1'), response('B2', 'Ado (11-17 ans)')])
+    sync = SheetSync()
+
+    frame = sync.sync(sheet)
+    assert frame['Secret_Code'].tolist() == ['A1', 'B2']
+    assert sync.sync(sheet) is frame
+
+    sheet.append_rows([response('C3', minute=1), response('D4', minute=2)])
+    sheet.calls.clear()
+    frame = sync.sync(sheet)
+
+    assert frame['Secret_Code'].tolist() == ['A1', 'B2', 'C3', 'D4']
+    assert isinstance(frame['Category'].dtype, pd.CategoricalDtype)
+    # The cached grid size (3 rows) is refreshed once before reading rows 4-5
+    assert sheet.calls == ['worksheet metadata', ('get_values', 'A4:D5')]
+
+
+def test_sheet_sync_projection_counts_rows_with_empty_projected_cells():
+    sheet = FakeWorksheet(HEADER, [response('A1')])
+    sync = SheetSync(('Secret_Code', 'Category'))
+    sync.sync(sheet)
+
+    # Only the Timestamp (marker column) is filled in the first appended row
+    sheet.append_rows([['', '', 'Jamais', '2026-05-01T10:01:00'], response('C3', minute=2)])
+    frame = sync.sync(sheet)
+    assert list(frame.columns) == ['Secret_Code', 'Category']
+    assert len(frame) == 3
+    assert sync.rows_ingested == 3
+
+    sheet.append_rows([response('D4', minute=3)])
+    sheet.calls.clear()
+    frame = sync.sync(sheet)
+    assert frame['Secret_Code'].tolist()[-1] == 'D4'
+    assert sheet.calls[-1] == ('batch_get', ('D5:D5', 'A5:A5', 'B5:B5'))
+
+
+def test_sheet_sync_skips_read_past_the_grid():
+    sheet = FakeWorksheet(HEADER, [response('A1')])
+    sync = SheetSync()
+    frame = sync.sync(sheet)
+
+    sheet.calls.clear()
+    assert sync.sync(sheet) is frame
+    assert not any(isinstance(call, tuple) and call[0] == 'get_values' for call in sheet.calls)
+
+
+def test_sheet_sync_full_resync_keeps_unmodified_frame(monkeypatch):
+    monkeypatch.setattr(survey_store, 'FULL_RESYNC_SECONDS', -1)
+    sheet = FakeWorksheet(HEADER, [response('A1')])
+    sync = SheetSync()
+    frame = sync.sync(sheet)
+
+    assert sync.sync(sheet) is frame
+    assert sheet.calls.count('get_all_records') == 1
+
+    sheet.append_rows([response('B2', minute=1)])
+    assert len(sync.sync(sheet)) == 2
+    assert sheet.calls.count('get_all_records') == 2
+
+
+def test_sheet_sync_projected_full_reload_sees_rows_appended_through_another_handle(monkeypatch):
+    sheet = FakeWorksheet(HEADER, [response('A1'), response('B2')])
+    other_kiosk = sheet.spreadsheet.get_worksheet_by_id(sheet.id)
+    other_kiosk.append_rows([response(f"K{i}", minute=i) for i in range(4)])
+
+    # Same result as the full-width load, although `sheet` still caches a 3-row grid
+    sync = SheetSync(('Secret_Code', 'Category'))
+    assert len(sync.sync(sheet)) == 6
+    assert len(SheetSync().sync(sheet)) == 6
+
+    # The periodic full resync keeps every row instead of falling back to the cached grid size
+    monkeypatch.setattr(survey_store, 'FULL_RESYNC_SECONDS', -1)
+    other_kiosk.append_rows([response('L1', minute=9)])
+    assert sync.sync(sheet)['Secret_Code'].tolist()[-1] == 'L1'
+    assert len(sync.sync(sheet)) == 7
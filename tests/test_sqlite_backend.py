@@ -0,0 +1,42 @@
+import sqlite3
+
+from survey_store import RESPONSE_COLUMNS, SQLiteBackend
+
+
+def test_sqlite_lookup_normalizes_the_pseudo(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "responses.sqlite3"))
+    backend.append({'Secret_Code': 'Élodie', 'Category': 'Adulte', 'Screen_Habit': 'Souvent',
+                    'Timestamp': '2026-05-01T10:00:00'})
+
+    row = backend.lookup(' éLODIE ')
+    assert row['Secret_Code'] == 'Élodie'
+    assert row['Category'] == 'Adulte'
+    assert backend.lookup('Luna') is None
+
+
+def test_sqlite_project_reuses_frame_until_a_write(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "responses.sqlite3"))
+    backend.append({'Secret_Code': 'A1', 'Category': 'Adulte'})
+    frame = backend.project(('Secret_Code', 'Category'))
+    assert list(frame.columns) == ['Secret_Code', 'Category']
+    assert backend.project(('Secret_Code', 'Category')) is frame
+
+    backend.append({'Secret_Code': 'B2', 'Category': 'Ado (11-17 ans)'})
+    assert backend.project(('Secret_Code', 'Category'))['Secret_Code'].tolist() == ['A1', 'B2']
+
+
+def test_sqlite_migrates_files_without_pseudo_key(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    columns = ", ".join(f'"{column}"' for column in RESPONSE_COLUMNS)
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(f"CREATE TABLE responses ({columns})")
+        connection.execute('CREATE INDEX idx_responses_secret_code ON responses ("Secret_Code" COLLATE NOCASE)')
+        connection.execute('INSERT INTO responses ("Secret_Code", "Category") VALUES (?, ?)', ('émile ', 'Adulte'))
+    connection.close()
+
+    backend = SQLiteBackend(path)
+    assert backend.lookup('ÉMILE')['Category'] == 'Adulte'
+    indexes = [row[1] for row in backend.connection.execute("PRAGMA index_list(responses)")]
+    assert 'idx_responses_pseudo_key' in indexes
+    assert 'idx_responses_secret_code' not in indexes
@@ -0,0 +1,133 @@
+import json
+import time
+
+import gspread
+import requests
+
+from survey_store import SubmissionWriter
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def api_error(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({"error": {"code": status, "message": "rejected"}}).encode()
+    return gspread.exceptions.APIError(response)
+
+
+def write_journal(journal_path, lines, offset):
+    with open(journal_path, "w", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+    with open(journal_path + ".offset", "w", encoding="utf-8") as f:
+        f.write(str(offset))
+
+
+def test_submission_writer_replays_rows_past_the_offset(tmp_path):
+    journal_path = str(tmp_path / "journal" / "sheet_Reponses.jsonl")
+    (tmp_path / "journal").mkdir()
+    write_journal(journal_path, ['["r1"]', '["r2"]', '["r3"]'], 1)
+
+    flushed = []
+    writer = SubmissionWriter(journal_path, flushed.append)
+    wait_until(lambda: not writer.pending)
+
+    assert flushed == [[["r2"], ["r3"]]]
+    with writer.lock:
+        assert open(journal_path, encoding="utf-8").read() == ""
+        assert open(journal_path + ".offset", encoding="utf-8").read() == "0"
+
+
+def test_submission_writer_retries_after_failed_flush(tmp_path):
+    journal_path = str(tmp_path / "journal" / "sheet_Reponses.jsonl")
+    attempts = []
+
+    def flush(rows):
+        attempts.append(rows)
+        if len(attempts) == 1:
+            raise ConnectionError("quota exceeded")
+
+    writer = SubmissionWriter(journal_path, flush)
+    writer.submit(["Luna", "Adulte"])
+    wait_until(lambda: len(attempts) == 2)
+    wait_until(lambda: not writer.pending)
+
+    assert attempts == [[["Luna", "Adulte"]], [["Luna", "Adulte"]]]
+
+
+def test_submission_writer_restart_replays_unflushed_rows(tmp_path):
+    journal_path = str(tmp_path / "journal" / "sheet_Reponses.jsonl")
+
+    def offline(rows):
+        raise ConnectionError("offline")
+
+    crashed = SubmissionWriter(journal_path, offline)
+    crashed.submit(["Luna", "Adulte"])
+    crashed.submit(["Sol", "Ado (11-17 ans)"])
+
+    flushed = []
+    writer = SubmissionWriter(journal_path, flushed.append)
+    wait_until(lambda: not writer.pending)
+    assert flushed == [[["Luna", "Adulte"], ["Sol", "Ado (11-17 ans)"]]]
+
+
+def test_submission_writer_retries_quota_errors(tmp_path):
+    journal_path = str(tmp_path / "journal" / "sheet_Reponses.jsonl")
+    attempts = []
+
+    def flush(rows):
+        attempts.append(rows)
+        if len(attempts) == 1:
+            raise api_error(429)
+
+    writer = SubmissionWriter(journal_path, flush)
+    writer.submit(["Luna", "Adulte"])
+    wait_until(lambda: not writer.pending)
+    assert len(attempts) == 2
+    assert not (tmp_path / "journal" / "sheet_Reponses.jsonl.rejected").exists()
+
+
+def test_submission_writer_sets_rejected_rows_aside(tmp_path):
+    journal_path = str(tmp_path / "journal" / "sheet_Reponses.jsonl")
+    (tmp_path / "journal").mkdir()
+    write_journal(journal_path, ['["g1"]', '["bad"]', '["g2"]'], 0)
+    sent = []
+
+    def flush(rows):
+        if ["bad"] in rows:
+            raise api_error(400)
+        sent.extend(rows)
+
+    writer = SubmissionWriter(journal_path, flush)
+    wait_until(lambda: not writer.pending)
+    assert sent == [["g1"], ["g2"]]
+    assert open(journal_path + ".rejected", encoding="utf-8").read() == '["bad"]\n'
+
+    # The queue keeps moving after a rejected row
+    writer.submit(["g3"])
+    wait_until(lambda: not writer.pending)
+    assert sent[-1] == ["g3"]
+
+
+def test_submission_writer_offset_past_a_truncated_journal_is_reset(tmp_path):
+    # Crash after the journal was compacted but before the offset went back to 0
+    journal_path = str(tmp_path / "journal" / "sheet_Reponses.jsonl")
+    (tmp_path / "journal").mkdir()
+    write_journal(journal_path, [], 5)
+
+    def offline(rows):
+        raise ConnectionError("offline")
+
+    crashed = SubmissionWriter(journal_path, offline)
+    assert crashed.pending == []
+    crashed.submit(["Luna"])
+
+    flushed = []
+    writer = SubmissionWriter(journal_path, flushed.append)
+    wait_until(lambda: not writer.pending)
+    assert flushed == [[["Luna"]]]